@@ -0,0 +1,209 @@
+"""
+/config/admission.py
+
+prod DB 보호용 동시 실행 제한 (admission control).
+
+환경(prod/stage) × 쿼리 종류(dashboard / adhoc / export / background) 마다
+동시에 실행할 수 있는 쿼리 수를 제한하고, 넘치는 요청은 대기열에서 기다린다.
+대기열이 가득 차면 바로 429, 대기 시간을 넘기면 503 으로 거절한다.
+
+    @query_class("dashboard")
+    def get_total_users(env="prod"): ...
+
+    with query_class_scope("adhoc"):
+        run_query(...)
+
+설정: ADMISSION_{ENV}_{CLASS}_LIMIT / _QUEUE / _WAIT  (예: ADMISSION_PROD_ADHOC_LIMIT=2)
+"""
+
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.metrics import Counter, Histogram, register_collector
+
+# 종류별 기본값: (동시 실행 수, 대기열 길이, 최대 대기 시간(초))
+_DEFAULTS = {
+    "prod": {
+        "dashboard": (6, 30, 10),
+        "adhoc": (2, 4, 5),
+        "export": (1, 2, 5),
+        # 백그라운드 집계 (rollup 동기화, 가입자 재조정): 화면 요청과 슬롯을 나누지 않고 오래 기다려도 된다
+        "background": (1, 4, 300),
+    },
+    "stage": {
+        "dashboard": (10, 50, 10),
+        "adhoc": (4, 8, 10),
+        "export": (2, 4, 10),
+        "background": (1, 4, 300),
+    },
+}
+
+QUERY_CLASSES = tuple(_DEFAULTS["prod"])
+
+ADMISSION_QUEUE_TIME = Histogram(
+    "app_admission_queue_seconds", "쿼리 실행 전 대기열에서 기다린 시간", ["env", "query_class"]
+)
+
+ADMISSION_REJECTED = Counter(
+    "app_admission_rejected_total", "동시 실행 제한으로 거절된 쿼리 수", ["env", "query_class", "reason"]
+)
+
+
+class AdmissionRejected(Exception):
+    """동시 실행 한도 초과로 쿼리를 거절할 때 발생한다. status 는 응답 코드(429/503)."""
+
+    def __init__(self, message, status=503, retry_after=5):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class Limiter:
+    """대기열이 있는 세마포어."""
+
+    def __init__(self, env, name, limit, max_queue, max_wait):
+        self.env = env
+        self.name = name
+        self.limit = max(limit, 1)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        start = time.monotonic()
+        with self._cond:
+            if self.active >= self.limit or self.waiting:
+                if self.waiting >= self.max_queue:
+                    ADMISSION_REJECTED.inc(env=self.env, query_class=self.name, reason="queue_full")
+                    raise AdmissionRejected(
+                        f"DB 부하 보호: {self.env} {self.name} 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.",
+                        status=429,
+                        retry_after=max(int(self.max_wait), 1),
+                    )
+
+                self.waiting += 1
+                try:
+                    deadline = start + self.max_wait
+                    while self.active >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            ADMISSION_REJECTED.inc(env=self.env, query_class=self.name, reason="wait_timeout")
+                            raise AdmissionRejected(
+                                f"DB 부하 보호: {self.env} {self.name} 대기 시간({self.max_wait}초)을 넘겼습니다.",
+                                status=503,
+                                retry_after=max(int(self.max_wait), 1),
+                            )
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+
+            self.active += 1
+
+        ADMISSION_QUEUE_TIME.observe(time.monotonic() - start, env=self.env, query_class=self.name)
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _setting(env, name, key, default):
+    return float(os.getenv(f"ADMISSION_{env.upper()}_{name.upper()}_{key}", default))
+
+
+def get_limiter(env, name):
+    key = (env, name)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                limit, queue, wait = _DEFAULTS.get(env, _DEFAULTS["stage"])[name]
+                limiter = Limiter(
+                    env, name,
+                    limit=int(_setting(env, name, "LIMIT", limit)),
+                    max_queue=int(_setting(env, name, "QUEUE", queue)),
+                    max_wait=_setting(env, name, "WAIT", wait),
+                )
+                _limiters[key] = limiter
+    return limiter
+
+
+# ===================================================
+# 쿼리 종류 지정
+# ===================================================
+_query_class = contextvars.ContextVar("query_class", default=None)
+
+
+def query_class(name):
+    """함수 안에서 실행되는 쿼리를 name 종류로 제한하는 데코레이터."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            token = _query_class.set(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _query_class.reset(token)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def query_class_scope(name):
+    """with query_class_scope("adhoc"): 블록 안의 쿼리를 name 종류로 제한한다."""
+    token = _query_class.set(name)
+    try:
+        yield
+    finally:
+        _query_class.reset(token)
+
+
+def current_query_class():
+    """지금 지정된 쿼리 종류 (없으면 None)"""
+    return _query_class.get()
+
+
+@contextmanager
+def admit(env, name=None):
+    """
+    쿼리 종류(name, 없으면 현재 종류)의 슬롯을 얻은 동안만 실행한다. 종류가 없으면 제한하지 않는다.
+    """
+    name = name or _query_class.get()
+    if name is None:
+        yield
+        return
+
+    with get_limiter(env, name).slot():
+        yield
+
+
+@register_collector
+def _collect_admission():
+    limiters = list(_limiters.values())
+    return [
+        ("app_admission_active", "gauge", "실행 중인 쿼리 수",
+         [({"env": l.env, "query_class": l.name}, l.active) for l in limiters]),
+        ("app_admission_waiting", "gauge", "대기열의 쿼리 수",
+         [({"env": l.env, "query_class": l.name}, l.waiting) for l in limiters]),
+        ("app_admission_limit", "gauge", "동시 실행 한도",
+         [({"env": l.env, "query_class": l.name}, l.limit) for l in limiters]),
+    ]
@@ -1,48 +1,26 @@
-import pymysql
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from config.db_config import run_query, run_query_iter
+from config.env_registry import get_env_config
 
 # ===================================================
 # DB 환경을 선택하는 함수 (env="stage"/"prod")
 # ===================================================
 
 def get_db_config(env="stage"):
-    env = env.lower().strip()
-
-    if env == "prod":
-        host = os.getenv("PROD_DB_HOST")
-        port = int(os.getenv("PROD_DB_PORT"))
-        user = os.getenv("PROD_DB_USER")
-        password = os.getenv("PROD_DB_PASSWORD")
-        database = os.getenv("PROD_DB_NAME")
-    else:
-        host = os.getenv("STAGE_DB_HOST")
-        port = int(os.getenv("STAGE_DB_PORT"))
-        user = os.getenv("STAGE_DB_USER")
-        password = os.getenv("STAGE_DB_PASSWORD")
-        database = os.getenv("STAGE_DB_NAME")
-
-    return {
-        "host": host,
-        "user": user,
-        "password": password,
-        "database": database,
-        "port": port,
-        "cursorclass": pymysql.cursors.DictCursor,
-        "charset": "utf8mb4"
-    }
+    return get_env_config(env)
 
 # ===================================================
 # 공통 쿼리 함수
 # ===================================================
 
 def query_db(sql, params=None, env="stage"):
-    config = get_db_config(env)
-    conn = pymysql.connect(**config)
+    env = env.lower().strip()
+    return run_query(env, sql, params)
+
 
-    with conn:
-        cur = conn.cursor()
-        cur.execute(sql, params)
-        return cur.fetchall()
+def query_db_iter(sql, params=None, env="stage", chunk_size=None, query_class=None):
+    """
+    query_db 의 스트리밍 버전 (서버 측 커서로 한 행 / chunk 단위 반환)
+    query_class 로 동시 실행 제한 종류를 지정한다. (예: 대용량 조회는 "export")
+    """
+    env = env.lower().strip()
+    return run_query_iter(env, sql, params, chunk_size, query_class=query_class)
@@ -3,64 +3,347 @@
 
 DB 접속 정보를 환경(stage·prod)에 따라 반환하고,
 run_query() 로 SQL을 실행하는 공통 DB 유틸리티 파일.
+커넥션은 환경별 공유 풀(config/db_pool.py)에서 빌려 쓴다.
 """
 
+import contextvars
+import functools
+import itertools
+import logging
 import os
+import threading
+import time
+from contextlib import contextmanager
+
 import pymysql
-from dotenv import load_dotenv
 
-load_dotenv()
+from config.admission import admit, current_query_class
+from config.db_pool import ConnectionPool, PoolTimeout
+from config.env_registry import (
+    ENV_NAMES,
+    get_env_config,
+    get_env_replicas,
+    normalize_env,
+    validate,
+)
+from config.query_log import QueryTimer
+from config.row_decode import build_decoder, decode_rows
+
+logger = logging.getLogger(__name__)
+
+# 커넥션 풀 설정 (.env 로 조정 가능)
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+POOL_PING_AFTER = int(os.getenv("DB_POOL_PING_AFTER", "30"))
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# run_query_iter 가 한 행씩 반환할 때 내부적으로 한 번에 읽어오는 행 수
+STREAM_FETCH_SIZE = 500
+
+_pools = {}
+_pools_lock = threading.Lock()
 
 
 def get_db_config(env):
-    """환경명(stage/prod)에 따라 DB 접속 정보를 반환한다."""
-    if env == "prod":
-        return {
-            "host": os.getenv("PROD_DB_HOST"),
-            "port": int(os.getenv("PROD_DB_PORT")),
-            "user": os.getenv("PROD_DB_USER"),
-            "password": os.getenv("PROD_DB_PASSWORD"),
-            "database": os.getenv("PROD_DB_NAME"),
-            "cursorclass": pymysql.cursors.DictCursor,
-            "charset": "utf8mb4"
-        }
-
-    # 기본 stage
-    return {
-        "host": os.getenv("STAGE_DB_HOST"),
-        "port": int(os.getenv("STAGE_DB_PORT")),
-        "user": os.getenv("STAGE_DB_USER"),
-        "password": os.getenv("STAGE_DB_PASSWORD"),
-        "database": os.getenv("STAGE_DB_NAME"),
-        "cursorclass": pymysql.cursors.DictCursor,
-        "charset": "utf8mb4"
-    }
-
-
-def make_json_safe(row):
-    """bytes 타입 컬럼은 UTF-8 또는 base64 문자열로 변환한다."""
-    import base64
-    safe = {}
-    for k, v in row.items():
-        if isinstance(v, bytes):
-            try:
-                safe[k] = v.decode("utf-8", errors="ignore")
-            except:
-                safe[k] = base64.b64encode(v).decode("utf-8")
+    """환경명(stage/prod)에 따라 DB 접속 정보를 반환한다. (env_registry 에서 한 번만 읽은 값)"""
+    return get_env_config(env)
+
+
+def _create_pool(key, config, fill=True):
+    """
+    key 에 해당하는 풀을 반환한다. 처음 호출될 때 생성한다.
+    fill=False 면 커넥션을 미리 열지 않는다. (첫 쿼리에서 열림 → 연결 실패를 호출한 쪽에서 처리)
+    """
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                config,
+                min_size=POOL_MIN_SIZE,
+                max_size=POOL_MAX_SIZE,
+                recycle=POOL_RECYCLE,
+                ping_after=POOL_PING_AFTER,
+                timeout=POOL_TIMEOUT,
+            )
+            _pools[key] = pool
+    if fill:
+        pool.fill()
+    return pool
+
+
+def get_pool(env):
+    """환경별 (primary) 커넥션 풀을 반환한다. 처음 호출될 때 생성한다."""
+    env = normalize_env(env)
+    return _create_pool(env, get_db_config(env))
+
+
+def get_pool_stats():
+    """생성된 모든 풀의 사용 현황을 {풀 이름: stats} 로 반환한다. (replica 는 "prod/host:port")"""
+    return {key: pool.stats() for key, pool in list(_pools.items())}
+
+
+# ===================================================
+# 시작 시 워밍업 / 준비 상태
+#   DB_WARMUP_CONNECTIONS 개 커넥션을 환경별로 미리 열어
+#   배포 직후 첫 요청이 설정 파싱 · 연결 비용을 내지 않게 한다.
+# ===================================================
+WARMUP_CONNECTIONS = int(os.getenv("DB_WARMUP_CONNECTIONS", str(POOL_MIN_SIZE)))
+# 워밍업 실패 시 다시 시도하는 간격(초): 1, 2, 4 ... 최대 DB_WARMUP_RETRY_MAX
+WARMUP_RETRY_MAX = float(os.getenv("DB_WARMUP_RETRY_MAX", "60"))
+# readiness 는 이 환경들만 본다 (stage 장애로 prod 서버가 빠지지 않도록)
+REQUIRED_ENVS = tuple(e.strip() for e in os.getenv("DB_REQUIRED_ENVS", "prod").split(",") if e.strip())
+
+_readiness = {env: {"status": "pending", "connections": 0, "error": None} for env in ENV_NAMES}
+
+
+def _warm_up_env(env, connections, retry=False):
+    """retry=True 면 성공할 때까지 간격을 늘려 가며 다시 시도한다. (백그라운드 스레드용)"""
+    delay = 1
+    while True:
+        try:
+            pool = get_pool(env)
+            pool.fill(connections)
+            _readiness[env] = {"status": "ready", "connections": pool.stats()["size"], "error": None}
+            return
+        except Exception as e:
+            logger.warning("DB 워밍업 실패 (%s): %r", env, e)
+            _readiness[env] = {"status": "error", "connections": 0, "error": str(e)}
+        if not retry:
+            return
+        time.sleep(delay)
+        delay = min(delay * 2, WARMUP_RETRY_MAX)
+
+
+def warm_up(connections=None, background=True):
+    """
+    설정을 검증하고 환경별로 커넥션을 미리 연다.
+    설정이 빠진 환경은 연결을 시도하지 않고 status="disabled" 로 표시한다.
+    background=True 면 연결에 실패한 환경은 성공할 때까지 백그라운드에서 다시 시도한다.
+    """
+    connections = WARMUP_CONNECTIONS if connections is None else connections
+    targets = []
+
+    for env, errors in validate().items():
+        if errors:
+            logger.warning("DB 환경 %s 비활성: %s", env, ", ".join(errors))
+            _readiness[env] = {"status": "disabled", "connections": 0, "error": ", ".join(errors)}
+        else:
+            targets.append(env)
+
+    for env in targets:
+        if background:
+            threading.Thread(target=_warm_up_env, args=(env, connections, True),
+                             name=f"db-warmup-{env}", daemon=True).start()
         else:
-            safe[k] = v
-    return safe
+            _warm_up_env(env, connections)
+
+
+def get_readiness():
+    """
+    {"ready": bool, "required": [...], "envs": {env: {"status", "connections", "error"}}}
+    ready 는 REQUIRED_ENVS (기본 prod) 가 모두 "ready" 일 때만 True. 나머지 환경은 표시만 한다.
+    """
+    envs = {env: dict(state) for env, state in _readiness.items()}
+    ready = all(envs.get(env, {}).get("status") == "ready" for env in REQUIRED_ENVS)
+    return {"ready": ready, "required": list(REQUIRED_ENVS), "envs": envs}
+
+
+# ===================================================
+# Read replica 라우팅
+#   PROD_REPLICA_HOSTS=replica1:3306,replica2  (계정 · DB 이름은 primary 와 동일)
+#   @read_replica 가 붙은 함수 안의 run_query / run_query_iter 는 replica 로 보내고,
+#   replica 연결이 실패하면 primary 로 다시 실행한다.
+# ===================================================
+REPLICA_STRATEGY = os.getenv("DB_REPLICA_STRATEGY", "round_robin")   # round_robin / least_loaded
+REPLICA_COOLDOWN = int(os.getenv("DB_REPLICA_COOLDOWN", "30"))
+
+# 연결 문제로 보고 primary 로 다시 보낼 서버 오류 코드
+# (1040 too many connections, 1053 shutdown, 1129/1130 host blocked/denied)
+# 2000 번대(CR_*)는 클라이언트 측 연결 오류라 모두 포함한다.
+_FALLBACK_SERVER_CODES = (1040, 1053, 1129, 1130)
+
+
+def is_connection_error(error):
+    """replica 연결 자체의 문제인지 확인한다. (쿼리 오류 · KILL QUERY 로 중단된 쿼리는 제외)"""
+    if isinstance(error, (pymysql.err.InterfaceError, PoolTimeout)):
+        return True
+    if isinstance(error, pymysql.err.OperationalError):
+        code = error.args[0] if error.args else 0
+        return code >= 2000 or code in _FALLBACK_SERVER_CODES
+    return False
 
+_use_replica = contextvars.ContextVar("use_replica", default=False)
+_replica_rr = itertools.count()
+_replica_down = {}     # 풀 이름 → 이 시각(monotonic)까지 사용 안 함
 
-def run_query(env, sql, params=None):
-    """DB 연결 후 SQL 실행하고 결과 rows 리스트(딕셔너리)를 반환한다."""
-    cfg = get_db_config(env)
 
-    conn = pymysql.connect(**cfg)
+def get_replica_configs(env):
+    """{ENV}_REPLICA_HOSTS 에 적힌 replica 들의 (풀 이름, 접속 정보) 목록을 반환한다."""
+    return get_env_replicas(env)
+
+
+def _read_pools(env):
+    """읽기 전용 쿼리를 보낼 풀 순서: (살아있는 replica 하나, primary)"""
+    primary = get_pool(env)
+    if not _use_replica.get():
+        return [(None, primary)]
+
+    now = time.monotonic()
+    replicas = [
+        (name, config) for name, config in get_replica_configs(env)
+        if _replica_down.get(name, 0) <= now
+    ]
+    if not replicas:
+        return [(None, primary)]
+
+    # replica 풀은 미리 채우지 않는다: 죽은 replica 의 연결 오류가 run_query 의
+    # primary 재시도 안에서 나도록 (여기서 나면 요청이 그대로 실패한다)
+    if REPLICA_STRATEGY == "least_loaded":
+        pools = [(name, _create_pool(name, config, fill=False)) for name, config in replicas]
+        name, pool = min(pools, key=lambda item: item[1].stats()["in_use"])
+    else:
+        name, config = replicas[next(_replica_rr) % len(replicas)]
+        pool = _create_pool(name, config, fill=False)
+
+    return [(name, pool), (None, primary)]
+
+
+def get_env_pools(env):
+    """env 의 모든 풀 (primary + replica 전부). 커넥션을 미리 열지 않는다. (KILL QUERY 대상 검색용)"""
+    env = normalize_env(env)
+    pools = [_create_pool(env, get_db_config(env), fill=False)]
+    pools += [_create_pool(name, config, fill=False) for name, config in get_replica_configs(env)]
+    return pools
+
+
+def _mark_replica_down(name, error):
+    _replica_down[name] = time.monotonic() + REPLICA_COOLDOWN
+    logger.warning("replica %s 사용 중지 (%ss): %r", name, REPLICA_COOLDOWN, error)
+
+
+def read_replica(func):
+    """함수 안에서 실행되는 run_query / run_query_iter 를 replica 로 보내는 데코레이터."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _use_replica.set(True)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """with use_replica(): 블록 안의 쿼리를 replica 로 보낸다."""
+    token = _use_replica.set(enabled)
     try:
-        with conn.cursor() as cur:
-            cur.execute(sql, params)
-            rows = cur.fetchall()
-            return [make_json_safe(r) for r in rows]
+        yield
     finally:
-        conn.close()
+        _use_replica.reset(token)
+
+
+def _run_on_pool(pool, env, sql, params, on_connect=None):
+    with admit(normalize_env(env)), QueryTimer(env, sql) as timer:
+        with pool.connection() as conn:
+            timer.mark("connect")
+            if on_connect is not None:
+                on_connect(conn.thread_id(), pool)
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                timer.mark("execute")
+                rows = decode_rows(cur, cur.fetchall())
+                timer.mark("fetch")
+        timer.rows = len(rows)
+    return rows
+
+
+def run_query(env, sql, params=None, on_connect=None):
+    """
+    풀에서 커넥션을 빌려 SQL 실행하고 결과 rows 리스트(딕셔너리)를 반환한다.
+    바이너리 컬럼은 config/row_decode.py 규칙으로 문자열/UUID/정수로 바뀌어 있다.
+    on_connect(connection_id, pool) 는 쿼리 실행 직전에 호출된다. (KILL QUERY 대상 추적용)
+    """
+    pools = _read_pools(env)
+
+    for name, pool in pools[:-1]:
+        try:
+            return _run_on_pool(pool, env, sql, params, on_connect)
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+            _mark_replica_down(name, e)
+
+    return _run_on_pool(pools[-1][1], env, sql, params, on_connect)
+
+
+def _open_stream(pools, sql, params, timer, on_connect=None):
+    """replica → primary 순서로 서버 측 커서를 연다. (pool, conn, cursor) 반환"""
+    for i, (name, pool) in enumerate(pools):
+        conn = None
+        try:
+            conn = pool.acquire()
+            timer.mark("connect")
+            if on_connect is not None:
+                on_connect(conn.thread_id(), pool)
+            cur = conn.cursor(pymysql.cursors.SSDictCursor)
+            cur.execute(sql, params)
+            return pool, conn, cur
+        except Exception as e:
+            if conn is not None:
+                pool.release(conn, discard=isinstance(e, (pymysql.err.OperationalError, pymysql.err.InterfaceError)))
+            if not is_connection_error(e) or i == len(pools) - 1:
+                raise
+            _mark_replica_down(name, e)
+        except BaseException:
+            if conn is not None:
+                pool.release(conn)
+            raise
+
+
+def run_query_iter(env, sql, params=None, chunk_size=None, on_connect=None, query_class=None):
+    """
+    서버 측 커서(SSDictCursor)로 결과를 흘려보내는 run_query 의 제너레이터 버전.
+    chunk_size 가 없으면 한 행씩, 있으면 chunk_size 개씩 묶은 리스트를 yield 한다.
+    전체 결과를 메모리에 올리지 않으므로 대용량 SELECT * / 다운로드에 사용한다.
+    query_class 가 없으면 호출한 시점의 쿼리 종류로 제한한다.
+    (제너레이터는 처음 next() 할 때 실행되므로 그때의 종류가 아니라 지금 종류를 넘긴다)
+    """
+    return _iter_query(env, sql, params, chunk_size, on_connect, query_class or current_query_class())
+
+
+def _iter_query(env, sql, params, chunk_size, on_connect, query_class):
+    with admit(normalize_env(env), query_class), QueryTimer(env, sql, kind="stream") as timer:
+        pool, conn, cur = _open_stream(_read_pools(env), sql, params, timer, on_connect)
+        timer.mark("execute")
+        finished = False
+        decode = None
+        try:
+            while True:
+                rows = cur.fetchmany(chunk_size or STREAM_FETCH_SIZE)
+                if rows and decode is None:
+                    decode = build_decoder(cur, list(rows[0])) or (lambda r: r)
+                if rows:
+                    rows = decode(rows)
+                timer.mark("fetch")
+                if not rows:
+                    break
+                timer.rows += len(rows)
+
+                if chunk_size:
+                    yield rows
+                else:
+                    yield from rows
+                # 소비하는 쪽에서 쓴 시간은 fetch 에 넣지 않는다
+                timer.skip()
+
+            cur.close()
+            finished = True
+        finally:
+            # 중간에 끊긴 경우 남은 결과를 끝까지 읽지 않도록 커넥션을 버린다
+            pool.release(conn, discard=not finished)
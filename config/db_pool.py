@@ -0,0 +1,222 @@
+"""
+/config/db_pool.py
+
+환경(stage·prod)별로 공유하는 pymysql 커넥션 풀.
+매 쿼리마다 TCP 연결 + 인증 핸드셰이크를 하지 않도록
+사용이 끝난 커넥션을 반납받아 재사용한다.
+
+- min_size  : 풀 생성 시 미리 열어두는 커넥션 수
+- max_size  : 동시에 열 수 있는 최대 커넥션 수 (초과 시 대기)
+- recycle   : 생성 후 이 시간(초)이 지난 커넥션은 폐기 후 새로 연결
+- ping_after: 이 시간(초) 이상 놀던 커넥션은 꺼낼 때 ping 으로 확인
+- timeout   : 빈 커넥션을 기다리는 최대 시간(초)
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pymysql
+
+
+class PoolTimeout(Exception):
+    """timeout 안에 커넥션을 얻지 못했을 때 발생한다."""
+
+
+class ConnectionPool:
+    """스레드 안전한 pymysql 커넥션 풀."""
+
+    def __init__(self, config, min_size=1, max_size=10,
+                 recycle=3600, ping_after=30, timeout=30):
+        self._config = dict(config)
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        self._idle = deque()      # (conn, created_at, last_used)
+        self._created_at = {}     # id(conn) → 생성 시각
+        self._size = 0            # 열려 있는(대여 + 유휴) 커넥션 수
+
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "discarded": 0,
+        }
+
+    # ===================================================
+    # 커넥션 생성 / 폐기
+    # ===================================================
+    def _open(self):
+        conn = pymysql.connect(**self._config)
+        with self._cond:
+            self._created_at[id(conn)] = time.monotonic()
+            self._stats["created"] += 1
+        return conn
+
+    def _close(self, conn):
+        with self._cond:
+            self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def connect_unpooled(self):
+        """풀과 상관없는 새 커넥션을 연다. (KILL QUERY 처럼 풀이 가득 차도 보내야 하는 명령용)"""
+        return pymysql.connect(**self._config)
+
+    def fill(self, count=None):
+        """열린 커넥션이 count(기본 min_size)개가 될 때까지 유휴 커넥션을 미리 열어둔다."""
+        count = self.min_size if count is None else min(count, self.max_size)
+        while True:
+            with self._cond:
+                if self._size >= count:
+                    return
+                self._size += 1
+            try:
+                conn = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((conn, self._created_at[id(conn)], time.monotonic()))
+                self._cond.notify()
+
+    # ===================================================
+    # 대여 / 반납
+    # ===================================================
+    def acquire(self):
+        """유휴 커넥션을 꺼내거나 새로 연다. 풀이 가득 차면 대기한다."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        entry = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"DB 커넥션 대기 시간 초과 ({self.timeout}s, max_size={self.max_size})"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            wait_time = time.monotonic() - start
+            self._stats["checkouts"] += 1
+            if waited:
+                self._stats["waits"] += 1
+            self._stats["wait_time_total"] += wait_time
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], wait_time)
+
+        try:
+            if entry is None:
+                return self._open()
+            return self._validate(*entry)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _validate(self, conn, created_at, last_used):
+        """오래된 커넥션은 재연결하고, 오래 놀던 커넥션은 ping 으로 확인한다."""
+        now = time.monotonic()
+
+        if self.recycle and now - created_at > self.recycle:
+            self._close(conn)
+            with self._cond:
+                self._stats["recycled"] += 1
+            return self._open()
+
+        if now - last_used > self.ping_after:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                self._close(conn)
+                with self._cond:
+                    self._stats["discarded"] += 1
+                return self._open()
+
+        return conn
+
+    def release(self, conn, discard=False):
+        """커넥션을 풀에 반납한다. 열린 트랜잭션은 rollback 해서 스냅샷을 끊는다."""
+        if not discard:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard:
+            self._close(conn)
+
+        with self._cond:
+            if discard:
+                self._size -= 1
+                self._stats["discarded"] += 1
+            else:
+                created_at = self._created_at.get(id(conn), time.monotonic())
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """with pool.connection() as conn: 형태로 대여/반납을 처리한다."""
+        conn = self.acquire()
+        try:
+            yield conn
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            # 연결 자체가 깨졌을 수 있으므로 재사용하지 않는다
+            self.release(conn, discard=True)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    # ===================================================
+    # 상태 / 종료
+    # ===================================================
+    def stats(self):
+        """풀 사용 현황과 대기 지표를 반환한다."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            })
+        checkouts = stats["checkouts"]
+        stats["wait_time_avg"] = stats["wait_time_total"] / checkouts if checkouts else 0.0
+        return stats
+
+    def close_all(self):
+        """유휴 커넥션을 모두 닫는다. (대여 중인 커넥션은 반납 시 풀로 돌아온다)"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+        for conn, _, _ in idle:
+            self._close(conn)
@@ -0,0 +1,115 @@
+"""
+/config/env_registry.py
+
+DB 환경(prod · stage) 설정을 프로세스에서 한 번만 읽고 검증하는 레지스트리.
+쿼리마다 os.getenv / int() 를 다시 하지 않고, 값이 빠진 환경은
+import 시점에 죽지 않고 errors 에 기록해 두었다가 그 환경을 쓸 때 알려준다.
+
+    .env
+    PROD_DB_HOST / PROD_DB_PORT / PROD_DB_USER / PROD_DB_PASSWORD / PROD_DB_NAME
+    PROD_REPLICA_HOSTS=replica1:3306,replica2   (선택)
+    STAGE_... 동일
+"""
+
+import os
+import threading
+
+import pymysql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ENV_NAMES = ("prod", "stage")
+_REQUIRED = ("HOST", "PORT", "USER", "PASSWORD", "NAME")
+
+_registry = None
+_lock = threading.Lock()
+
+
+class EnvConfigError(Exception):
+    """설정이 빠졌거나 잘못된 DB 환경을 사용하려 할 때 발생한다."""
+
+
+def normalize_env(env):
+    """"PROD " / "prod" → "prod", 그 외는 모두 "stage" (기존 get_db_config 와 같은 규칙)"""
+    return "prod" if (env or "").lower().strip() == "prod" else "stage"
+
+
+def _build(env):
+    prefix = env.upper()
+    values = {key: os.getenv(f"{prefix}_DB_{key}") for key in _REQUIRED}
+    errors = [f"{prefix}_DB_{key} 값이 없습니다" for key, v in values.items() if v is None]
+
+    port = None
+    if values["PORT"] is not None:
+        try:
+            port = int(values["PORT"])
+        except ValueError:
+            errors.append(f"{prefix}_DB_PORT 가 숫자가 아닙니다: {values['PORT']!r}")
+
+    config = None
+    replicas = []
+    if not errors:
+        config = {
+            "host": values["HOST"],
+            "port": port,
+            "user": values["USER"],
+            "password": values["PASSWORD"],
+            "database": values["NAME"],
+            "cursorclass": pymysql.cursors.DictCursor,
+            "charset": "utf8mb4"
+        }
+
+        for item in os.getenv(f"{prefix}_REPLICA_HOSTS", "").split(","):
+            item = item.strip()
+            if not item:
+                continue
+            host, _, replica_port = item.partition(":")
+            try:
+                replica_port = int(replica_port) if replica_port else port
+            except ValueError:
+                errors.append(f"{prefix}_REPLICA_HOSTS 포트가 숫자가 아닙니다: {item!r}")
+                continue
+            replicas.append((f"{env}/{host}:{replica_port}", dict(config, host=host, port=replica_port)))
+
+    return {"name": env, "config": config, "replicas": replicas, "errors": errors}
+
+
+def get_registry():
+    """{env: {"config", "replicas", "errors"}} 를 반환한다. 처음 호출될 때 한 번만 만든다."""
+    global _registry
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                _registry = {env: _build(env) for env in ENV_NAMES}
+    return _registry
+
+
+def reload_registry():
+    """.env / 환경변수를 다시 읽는다."""
+    global _registry
+    with _lock:
+        _registry = None
+    return get_registry()
+
+
+def _get(env):
+    entry = get_registry()[normalize_env(env)]
+    if entry["errors"]:
+        raise EnvConfigError(f"DB 환경 '{entry['name']}' 설정 오류: " + ", ".join(entry["errors"]))
+    return entry
+
+
+def get_env_config(env):
+    """검증된 접속 정보(dict 복사본)를 반환한다."""
+    return dict(_get(env)["config"])
+
+
+def get_env_replicas(env):
+    """[(풀 이름, 접속 정보), ...] replica 목록을 반환한다."""
+    return list(_get(env)["replicas"])
+
+
+def validate():
+    """{env: [오류 메시지, ...]} (문제 없으면 빈 리스트)"""
+    return {env: list(entry["errors"]) for env, entry in get_registry().items()}
@@ -0,0 +1,185 @@
+"""
+/config/query_log.py
+
+DB 쿼리 실행 시간 계측 + 느린 쿼리 로그.
+
+run_query / query_db 등 DB 진입점은 QueryTimer 로 쿼리를 감싸고
+connect(풀에서 커넥션 대여) · execute · fetch 단계별 시간과 행 수를 기록한다.
+SLOW_QUERY_MS 를 넘긴 쿼리는 호출한 서비스 함수 · Flask endpoint 와 함께
+회전 로그 파일(SLOW_QUERY_LOG)에 JSON 한 줄로 남긴다.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "1000"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "logs/slow_query.log")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+
+slow_logger = logging.getLogger("slow_query")
+slow_logger.setLevel(logging.INFO)
+slow_logger.propagate = False
+
+# 쿼리 한 건이 끝날 때마다 호출되는 함수들 (메트릭 수집 등)
+_listeners = []
+
+
+def _ensure_handler():
+    if slow_logger.handlers:
+        return
+    os.makedirs(os.path.dirname(SLOW_QUERY_LOG) or ".", exist_ok=True)
+    handler = RotatingFileHandler(
+        SLOW_QUERY_LOG,
+        maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=SLOW_QUERY_LOG_BACKUPS,
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    slow_logger.addHandler(handler)
+
+
+def add_query_listener(func):
+    """func(record) 를 쿼리 종료 때마다 호출하도록 등록한다."""
+    _listeners.append(func)
+
+
+# ===================================================
+# SQL fingerprint (값만 다른 쿼리를 하나로 묶는다)
+# ===================================================
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_SPACE_RE = re.compile(r"\s+")
+
+
+# ad-hoc 스크립트(/query/exec · 다운로드) 문장 앞에 붙는 태그 (services/query_service.py)
+ADHOC_TAG = "/* adhoc:"
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """리터럴을 ? 로 바꾸고 공백을 정리한 SQL 을 반환한다."""
+    fp = _COMMENT_RE.sub(" ", sql)
+    fp = _STRING_RE.sub("?", fp)
+    fp = _NUMBER_RE.sub("?", fp)
+    fp = _IN_LIST_RE.sub("IN (?+)", fp)
+    fp = _SPACE_RE.sub(" ", fp).strip().rstrip(";").strip()
+    return fp
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint_id(sql):
+    """fingerprint 의 짧은 해시 (로그 · 메트릭 라벨용)."""
+    return hashlib.sha1(fingerprint(sql).encode("utf-8")).hexdigest()[:12]
+
+
+# ===================================================
+# 호출 위치 (서비스 함수 / Flask endpoint)
+# ===================================================
+_SKIP_MODULES = ("config.", "utils.", "contextlib", "concurrent.", "threading")
+
+
+def _caller():
+    """DB 계층 밖에서 이 쿼리를 부른 첫 번째 함수 (services.* 우선)."""
+    frame = sys._getframe(2)
+    fallback = None
+
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_SKIP_MODULES):
+            name = f"{module}.{frame.f_code.co_name}"
+            if module.startswith("services."):
+                return name
+            if fallback is None:
+                fallback = name
+        frame = frame.f_back
+
+    return fallback
+
+
+def _endpoint():
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return None
+    if not has_request_context():
+        return None
+    return request.endpoint
+
+
+# ===================================================
+# 계측기
+# ===================================================
+class QueryTimer:
+    """
+    with QueryTimer(env, sql) as timer:
+        conn = ...;           timer.mark("connect")
+        cur.execute(...);     timer.mark("execute")
+        rows = cur.fetchall(); timer.mark("fetch")
+        timer.rows = len(rows)
+    """
+
+    def __init__(self, env, sql, kind="query"):
+        self.env = env
+        self.sql = sql
+        self.kind = kind
+        self.rows = 0
+        self.phases = {"connect": 0.0, "execute": 0.0, "fetch": 0.0}
+        self._start = None
+        self._last = None
+
+    def __enter__(self):
+        self._start = self._last = time.perf_counter()
+        return self
+
+    def mark(self, phase):
+        """직전 mark 이후 흐른 시간을 phase 에 더한다."""
+        now = time.perf_counter()
+        self.phases[phase] += now - self._last
+        self._last = now
+
+    def skip(self):
+        """직전 mark 이후 시간을 어느 단계에도 넣지 않는다. (스트리밍 소비자 처리 시간 등)"""
+        self._last = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, tb):
+        total = sum(self.phases.values()) + (time.perf_counter() - self._last)
+        record = {
+            "env": self.env,
+            "kind": self.kind,
+            "adhoc": self.sql.startswith(ADHOC_TAG),
+            "fingerprint": fingerprint(self.sql),
+            "fingerprint_id": fingerprint_id(self.sql),
+            "total_ms": round(total * 1000, 2),
+            "connect_ms": round(self.phases["connect"] * 1000, 2),
+            "execute_ms": round(self.phases["execute"] * 1000, 2),
+            "fetch_ms": round(self.phases["fetch"] * 1000, 2),
+            "rows": self.rows,
+            # 스트리밍을 중간에 멈춘 것(GeneratorExit)은 오류로 보지 않는다
+            "error": repr(exc) if exc is not None and exc_type is not GeneratorExit else None,
+        }
+
+        for listener in _listeners:
+            try:
+                listener(record)
+            except Exception:
+                pass
+
+        if record["total_ms"] >= SLOW_QUERY_MS:
+            record["caller"] = _caller()
+            record["endpoint"] = _endpoint()
+            record["ts"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            _ensure_handler()
+            slow_logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+        return False
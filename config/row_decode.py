@@ -0,0 +1,108 @@
+"""
+/config/row_decode.py
+
+결과 셋의 컬럼 정보(cursor.description / 필드 메타데이터)로
+"어떤 컬럼을 어떻게 바꿀지"를 한 번만 정해두고 행마다 그 컬럼만 변환한다.
+
+- BINARY(16) 이면서 이름이 ...id 인 컬럼 → UUID 문자열 (business_order_sheet_id 등)
+- BIT 컬럼                                → 정수
+- 그 밖의 BINARY / VARBINARY / BLOB 컬럼  → UTF-8 문자열 (깨지면 base64)
+- 나머지 컬럼은 건드리지 않는다.
+"""
+
+import base64
+import uuid
+
+from pymysql.constants import FIELD_TYPE
+
+BINARY_CHARSET = 63
+
+_BINARY_TYPES = {
+    FIELD_TYPE.STRING,
+    FIELD_TYPE.VAR_STRING,
+    FIELD_TYPE.VARCHAR,
+    FIELD_TYPE.TINY_BLOB,
+    FIELD_TYPE.MEDIUM_BLOB,
+    FIELD_TYPE.LONG_BLOB,
+    FIELD_TYPE.BLOB,
+    FIELD_TYPE.GEOMETRY,
+}
+
+
+def decode_bytes(v):
+    try:
+        return v.decode("utf-8")
+    except UnicodeDecodeError:
+        return base64.b64encode(v).decode("utf-8")
+
+
+def decode_uuid(v):
+    if len(v) == 16:
+        return str(uuid.UUID(bytes=v))
+    return decode_bytes(v)
+
+
+def decode_bit(v):
+    return int.from_bytes(v, "big")
+
+
+def _decode_if_bytes(v):
+    # 필드 메타데이터가 없어 문자/바이너리를 구분할 수 없는 경우
+    return decode_bytes(v) if isinstance(v, bytes) else v
+
+
+def build_decoder(cursor, keys):
+    """
+    cursor 의 컬럼 정보로 변환 함수를 만든다. 변환할 컬럼이 없으면 None.
+    keys 는 DictCursor 행의 키 순서 (중복 컬럼명은 "테이블.컬럼" 이 되므로 description 대신 사용)
+    """
+    description = cursor.description
+    if not description:
+        return None
+
+    fields = getattr(getattr(cursor, "_result", None), "fields", None)
+    converters = []
+
+    for i, (key, column) in enumerate(zip(keys, description)):
+        name, type_code = column[0], column[1]
+
+        if type_code == FIELD_TYPE.BIT:
+            converters.append((key, decode_bit))
+            continue
+
+        if type_code not in _BINARY_TYPES:
+            continue
+
+        if fields is None:
+            converters.append((key, _decode_if_bytes))
+            continue
+
+        field = fields[i]
+        if field.charsetnr != BINARY_CHARSET:
+            continue
+
+        if type_code == FIELD_TYPE.STRING and field.length == 16 and name.lower().endswith("id"):
+            converters.append((key, decode_uuid))
+        else:
+            converters.append((key, decode_bytes))
+
+    if not converters:
+        return None
+
+    def decode(rows):
+        for row in rows:
+            for key, convert in converters:
+                v = row[key]
+                if v is not None:
+                    row[key] = convert(v)
+        return rows
+
+    return decode
+
+
+def decode_rows(cursor, rows):
+    """rows(DictCursor 결과 리스트)를 제자리에서 변환해 반환한다."""
+    if not rows:
+        return rows
+    decode = build_decoder(cursor, list(rows[0]))
+    return decode(rows) if decode else rows
@@ -3,33 +3,20 @@ from flask import Flask, render_template, request, jsonify, send_file
 # ============================
 # QUERY
 # ============================
-from services.query_service import run_sql_query, export_to_excel
+from services.query_service import run_sql_query, export_to_excel, cancel_query, QueryAborted
 
 # ============================
-# KPI — 매출
+# KPI — 매출 / 가입자 (백그라운드 스냅샷)
 # ============================
-from services.dashboard_service import get_dashboard_sales
-
-# ============================
-# 결제 분석
-# ============================
-from services.payment_service import (
-    get_daily_sales,
-    get_payment_amount,
-    get_payment_count,
-    get_hourly_sales,
-    get_hourly_sales_count
-)
+from services.kpi_service import compute_home_kpis
+from services.kpi_refresher import get_snapshot, get_snapshot_meta, format_age, start_kpi_refresher
 
 # ============================
 # 가입자 분석
 # ============================
 from services.user_service import (
-    get_today_users,
-    get_yesterday_users,
-    get_monthly_users,
-    get_hourly_users,
-    get_total_users
+    USER_WINDOWS,
+    DEFAULT_USER_WINDOW
 )
 
 # ============================
@@ -47,12 +34,61 @@ from routes.refund_routes import refund_routes
 # ============================
 from routes.order_check_routes import order_check_routes
 
+# ============================
+# DMS / 리포트 조회 API (?stream=1 · ?format=columnar)
+# ============================
+from routes.dms_routes import dms_routes
+from routes.report_routes import report_routes
+
+# ============================
+# 임의 구간 매출 합계 API
+# ============================
+from routes.revenue_routes import revenue_routes
+
+# ============================
+# 결제 / 가입자 분석 차트 데이터 API (ETag / 304)
+# ============================
+from routes.analytics_routes import analytics_routes
+
+# ============================
+# /metrics (Prometheus)
+# ============================
+from routes.metrics_routes import metrics_routes
+from utils.metrics import ADHOC_IN_FLIGHT, EXPORT_BYTES
+
+# ============================
+# DB 환경 검증 / 워밍업
+# ============================
+from config.db_config import warm_up
+from config.admission import AdmissionRejected
+from config.env_registry import normalize_env
+from routes.health_routes import health_routes
+from services.rollup_service import start_rollup_sync
+from services.user_counter import start_user_counter
+
+# ============================
+# ?format=columnar 응답
+# ============================
+from utils.columnar import wants_columnar, to_columnar
+
+# ============================
+# JSON 직렬화 (orjson)
+# ============================
+from utils.json_provider import init_json
+
+# ============================
+# 응답 압축 (gzip / brotli)
+# ============================
+from utils.compress import init_compression
+
 
 
 # =========================================
 # Flask App 생성 (★ Blueprint보다 반드시 먼저!)
 # =========================================
 app = Flask(__name__)
+init_json(app)
+init_compression(app)
 
 
 # =========================================
@@ -60,6 +96,33 @@ app = Flask(__name__)
 # =========================================
 app.register_blueprint(refund_routes)
 app.register_blueprint(order_check_routes)
+app.register_blueprint(dms_routes)
+app.register_blueprint(report_routes)
+app.register_blueprint(metrics_routes)
+app.register_blueprint(health_routes)
+app.register_blueprint(revenue_routes)
+app.register_blueprint(analytics_routes)
+
+
+# =========================================
+# DB 설정 검증 + 커넥션 미리 열기 (백그라운드)
+# 시간 단위 rollup 동기화 / KPI 스냅샷 / 총 가입자 카운터 갱신 시작 (백그라운드)
+# =========================================
+warm_up()
+start_rollup_sync()
+start_kpi_refresher()
+start_user_counter()
+
+
+# =========================================
+# DB 동시 실행 한도 초과 → 429 / 503
+# =========================================
+@app.errorhandler(AdmissionRejected)
+def admission_rejected(e):
+    response = jsonify({"result": "ERROR", "message": str(e)})
+    response.status_code = e.status
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response
 
 
 
@@ -70,38 +133,10 @@ app.register_blueprint(order_check_routes)
 def home():
 
     # ----------------------
-    # 1) 매출 KPI
-    # ----------------------
-    sales = get_dashboard_sales("prod")
-
-    # ----------------------
-    # 2) 오늘 / 어제 가입자 수
+    # 0) KPI — 백그라운드 스냅샷 (없으면 직접 계산)
     # ----------------------
-    today_users = get_today_users("prod")
-    yesterday_users = get_yesterday_users("prod")
-
-    if yesterday_users == 0:
-        user_percent = 100 if today_users > 0 else 0
-    else:
-        user_percent = round(((today_users - yesterday_users) / yesterday_users) * 100, 1)
-
-    user_kpi = {
-        "today": today_users,
-        "yesterday": yesterday_users,
-        "percent": user_percent,
-        "is_up": today_users >= yesterday_users
-    }
-
-    # ----------------------
-    # 3) 총 사용자 수 KPI
-    # ----------------------
-    total_users = get_total_users("prod")
-
-    user_total_kpi = {
-        "total": total_users,
-        "delta": today_users,
-        "is_up": today_users > 0
-    }
+    snap = get_snapshot("prod", "home")
+    kpis = snap["value"] if snap else compute_home_kpis("prod")
 
     # ----------------------
     # 4) 메뉴 (좌측)
@@ -169,9 +204,10 @@ def home():
         data_query=data_query,
         analytics=analytics,
         reports=[],
-        sales=sales,
-        user_kpi=user_kpi,
-        user_total_kpi=user_total_kpi
+        sales=kpis["sales"],
+        user_kpi=kpis["user_kpi"],
+        user_total_kpi=kpis["user_total_kpi"],
+        snapshot_age=format_age(snap["age"]) if snap else None
     )
 
 
@@ -204,13 +240,19 @@ def car_search():
 @app.route("/user-analytics")
 def user_analytics():
 
-    month_users = get_monthly_users("prod")
-    hourly_users = get_hourly_users("prod")
+    # ?days=7 / 30 / 90 / 365
+    days = request.args.get("days", DEFAULT_USER_WINDOW, type=int)
+    if days not in USER_WINDOWS:
+        days = DEFAULT_USER_WINDOW
+
+    # 차트 데이터는 화면이 /api/analytics/users/* 에서 따로 불러온다
+    meta = get_snapshot_meta("prod", "users") if days == DEFAULT_USER_WINDOW else None
 
     return render_template(
         "user_analytics.html",
-        month_users=month_users,
-        hourly_users=hourly_users
+        snapshot_age=format_age(meta["age"]) if meta else None,
+        days=days,
+        windows=USER_WINDOWS
     )
 
 
@@ -221,19 +263,13 @@ def user_analytics():
 @app.route("/payment-analytics")
 def payment_analytics():
 
-    daily = get_daily_sales("prod")
-    amount = get_payment_amount("prod")
-    count = get_payment_count("prod")
-    hourly_sales = get_hourly_sales("prod")
-    hourly_count = get_hourly_sales_count("prod")
+    # 차트 데이터(daily / amount / count / hourly_sales / hourly_count)는
+    # 화면이 /api/analytics/payment/* 에서 병렬로 불러온다
+    meta = get_snapshot_meta("prod", "payment")
 
     return render_template(
         "payment_analytics.html",
-        daily=daily,
-        amount=amount,
-        count=count,
-        hourly_sales=hourly_sales,
-        hourly_count=hourly_count
+        snapshot_age=format_age(meta["age"]) if meta else None
     )
 
 
@@ -303,12 +339,28 @@ def query_exec():
     data = request.json
     sql = data.get("sql")
     env = data.get("env", "prod")
+    metric_env = normalize_env(env)   # 메트릭 라벨은 prod / stage 두 값만
 
+    ADHOC_IN_FLIGHT.inc(env=metric_env)
     try:
-        rows = run_sql_query(sql, env)
+        rows = run_sql_query(sql, env, run_id=data.get("run_id"), timeout=data.get("timeout"))
+        if wants_columnar(data):
+            rows = [{"sql": r["sql"], "rows": to_columnar(r["rows"])} for r in rows]
         return jsonify({"result": "OK", "rows": rows})
+    except AdmissionRejected:
+        raise
     except Exception as e:
         return jsonify({"result": "ERROR", "message": str(e)})
+    finally:
+        ADHOC_IN_FLIGHT.dec(env=metric_env)
+
+
+
+@app.route("/query/cancel", methods=["POST"])
+def query_cancel():
+    data = request.json
+    cancelled = cancel_query(data.get("run_id"), data.get("env", "prod"))
+    return jsonify({"result": "OK", "cancelled": cancelled})
 
 
 
@@ -318,7 +370,12 @@ def query_download():
     sql = data.get("sql")
     env = data.get("env", "prod")
 
-    output = export_to_excel(sql, env)
+    try:
+        output = export_to_excel(sql, env, run_id=data.get("run_id"), timeout=data.get("timeout"))
+    except QueryAborted as e:
+        # 시간 초과 / 취소 → 화면에서 이유를 보여줄 수 있게 JSON 으로
+        return jsonify({"result": "ERROR", "message": str(e)})
+    EXPORT_BYTES.observe(output.getbuffer().nbytes, kind="query")
 
     return send_file(
         output,
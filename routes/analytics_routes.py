@@ -0,0 +1,69 @@
+# routes/analytics_routes.py
+from flask import Blueprint, jsonify, request
+
+from services.kpi_refresher import get_snapshot, get_snapshot_meta
+from services.payment_service import get_trade_metrics
+from services.user_service import get_user_analytics, USER_WINDOWS, DEFAULT_USER_WINDOW
+from utils.http_cache import conditional_json, not_modified
+
+analytics_routes = Blueprint("analytics", __name__, url_prefix="/api/analytics")
+
+# 차트별 데이터 (get_trade_metrics / get_user_analytics 결과의 키)
+PAYMENT_DATASETS = ("daily", "amount", "count", "hourly_sales", "hourly_count")
+USER_DATASETS = ("daily", "hourly")
+
+
+def _error(message, status):
+    return jsonify({"result": "ERROR", "message": message}), status
+
+
+def _snapshot_json(env, name, dataset, compute):
+    """
+    스냅샷이 있으면 computed_at 을 데이터 버전으로 쓴다 → 값을 읽기 전에 304 판단.
+    스냅샷이 없으면 compute() 로 계산하고 본문 해시를 ETag 로 쓴다.
+    """
+    meta = get_snapshot_meta(env, name)
+    if meta:
+        response = not_modified(f"{env}:{name}:{dataset}:{meta['computed_at']!r}")
+        if response is not None:
+            return response
+
+    snap = get_snapshot(env, name)
+    if snap:
+        version = f"{env}:{name}:{dataset}:{snap['computed_at']!r}"
+        return conditional_json(snap["value"][dataset], version)
+
+    return conditional_json(compute()[dataset])
+
+
+# ===============================
+# 💳 결제 분석 차트 데이터
+#   /api/analytics/payment/daily | amount | count | hourly_sales | hourly_count
+# ===============================
+@analytics_routes.route("/payment/<dataset>")
+def payment_dataset(dataset):
+    if dataset not in PAYMENT_DATASETS:
+        return _error(f"알 수 없는 데이터: {dataset}", 404)
+
+    env = request.args.get("env", "prod")
+    return _snapshot_json(env, "payment", dataset, lambda: get_trade_metrics(env))
+
+
+# ===============================
+# 👤 가입자 분석 차트 데이터
+#   /api/analytics/users/daily | hourly ?days=7 / 30 / 90 / 365
+# ===============================
+@analytics_routes.route("/users/<dataset>")
+def user_dataset(dataset):
+    if dataset not in USER_DATASETS:
+        return _error(f"알 수 없는 데이터: {dataset}", 404)
+
+    env = request.args.get("env", "prod")
+    days = request.args.get("days", DEFAULT_USER_WINDOW, type=int)
+    if days not in USER_WINDOWS:
+        return _error(f"days 는 {', '.join(map(str, USER_WINDOWS))} 중 하나여야 합니다", 400)
+
+    # 기본 기간만 백그라운드 스냅샷이 있다
+    if days == DEFAULT_USER_WINDOW:
+        return _snapshot_json(env, "users", dataset, lambda: get_user_analytics(env, days))
+    return conditional_json(get_user_analytics(env, days)[dataset])
@@ -0,0 +1,23 @@
+# routes/health_routes.py
+from flask import Blueprint, jsonify
+
+from config.db_config import get_readiness
+
+health_routes = Blueprint("health", __name__, url_prefix="/health")
+
+
+# ===============================
+# ❤️ 프로세스 생존 확인
+# ===============================
+@health_routes.route("/live")
+def live():
+    return jsonify({"ok": True})
+
+
+# ===============================
+# ✅ DB 워밍업 완료 여부 (로드밸런서 readiness 체크용)
+# ===============================
+@health_routes.route("/ready")
+def ready():
+    state = get_readiness()
+    return jsonify(state), (200 if state["ready"] else 503)
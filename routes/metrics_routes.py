@@ -0,0 +1,130 @@
+# routes/metrics_routes.py
+import time
+
+from flask import Blueprint, Response, g, request
+
+from config.db_config import get_pool_stats
+from config.env_registry import normalize_env
+from config.query_log import add_query_listener
+from utils.cache import cache_stats
+from utils.metrics import Counter, Histogram, register_collector, render
+
+metrics_routes = Blueprint("metrics", __name__)
+
+
+# ===============================
+# 요청 / DB 메트릭
+# ===============================
+REQUEST_LATENCY = Histogram(
+    "app_request_duration_seconds", "라우트별 요청 처리 시간", ["route", "method", "status"]
+)
+
+DB_QUERY_LATENCY = Histogram(
+    "app_db_query_duration_seconds", "SQL fingerprint 별 쿼리 시간", ["env", "fingerprint_id", "kind"]
+)
+
+DB_QUERY_ERRORS = Counter(
+    "app_db_query_errors_total", "SQL fingerprint 별 쿼리 오류 수", ["env", "fingerprint_id"]
+)
+
+DB_QUERY_ROWS = Counter(
+    "app_db_query_rows_total", "SQL fingerprint 별 반환 행 수", ["env", "fingerprint_id"]
+)
+
+# fingerprint_id → SQL fingerprint (라벨 조회용 info 메트릭)
+_fingerprints = {}
+
+# ad-hoc 스크립트(/query/exec · 다운로드)는 SQL 이 매번 달라 라벨이 끝없이 늘어나므로 하나로 묶는다
+ADHOC_FINGERPRINT_ID = "adhoc"
+
+
+def _observe_query(record):
+    env = normalize_env(record["env"])
+    if record["adhoc"]:
+        fid = ADHOC_FINGERPRINT_ID
+    else:
+        fid = record["fingerprint_id"]
+        _fingerprints.setdefault(fid, record["fingerprint"][:300])
+
+    DB_QUERY_LATENCY.observe(record["total_ms"] / 1000, env=env, fingerprint_id=fid, kind=record["kind"])
+    DB_QUERY_ROWS.inc(record["rows"], env=env, fingerprint_id=fid)
+    if record["error"]:
+        DB_QUERY_ERRORS.inc(env=env, fingerprint_id=fid)
+
+
+add_query_listener(_observe_query)
+
+
+@metrics_routes.before_app_request
+def _start_timer():
+    g._metrics_start = time.perf_counter()
+
+
+@metrics_routes.after_app_request
+def _record_request(response):
+    start = g.pop("_metrics_start", None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            route=route, method=request.method, status=response.status_code
+        )
+    return response
+
+
+# ===============================
+# 스크레이프 시점에 계산하는 메트릭
+# ===============================
+@register_collector
+def _collect_pool():
+    fields = [
+        ("app_db_pool_size", "gauge", "열려 있는 커넥션 수", "size"),
+        ("app_db_pool_in_use", "gauge", "대여 중인 커넥션 수", "in_use"),
+        ("app_db_pool_idle", "gauge", "유휴 커넥션 수", "idle"),
+        ("app_db_pool_max_size", "gauge", "최대 커넥션 수", "max_size"),
+        ("app_db_pool_checkouts_total", "counter", "커넥션 대여 횟수", "checkouts"),
+        ("app_db_pool_waits_total", "counter", "풀이 가득 차 대기한 횟수", "waits"),
+        ("app_db_pool_wait_seconds_total", "counter", "커넥션 대기 시간 합계", "wait_time_total"),
+        ("app_db_pool_timeouts_total", "counter", "커넥션 대기 시간 초과 횟수", "timeouts"),
+    ]
+    stats = get_pool_stats()
+    return [
+        (name, kind, help_text, [({"pool": pool}, s[field]) for pool, s in stats.items()])
+        for name, kind, help_text, field in fields
+    ]
+
+
+@register_collector
+def _collect_cache():
+    stats = cache_stats()
+    functions = stats["functions"].items()
+    return [
+        ("app_cache_entries", "gauge", "캐시 항목 수", [({}, stats["entries"])]),
+        ("app_cache_bytes", "gauge", "캐시 크기(대략, bytes)", [({}, stats["bytes"])]),
+        ("app_cache_hits_total", "counter", "함수별 캐시 hit",
+         [({"function": name}, c["hits"]) for name, c in functions]),
+        ("app_cache_stale_hits_total", "counter", "함수별 만료된 값 반환(백그라운드 갱신)",
+         [({"function": name}, c["stale_hits"]) for name, c in functions]),
+        ("app_cache_misses_total", "counter", "함수별 캐시 miss",
+         [({"function": name}, c["misses"]) for name, c in functions]),
+        ("app_cache_coalesced_total", "counter", "함수별 다른 호출의 계산 결과를 기다린 호출",
+         [({"function": name}, c["coalesced"]) for name, c in functions]),
+        ("app_cache_hit_ratio", "gauge", "함수별 캐시 hit 비율",
+         [({"function": name}, c["hit_ratio"]) for name, c in functions]),
+    ]
+
+
+@register_collector
+def _collect_fingerprints():
+    return [
+        ("app_db_query_fingerprint_info", "gauge", "fingerprint_id 에 해당하는 SQL",
+         [({"fingerprint_id": fid, "fingerprint": fp}, 1) for fid, fp in list(_fingerprints.items())]),
+    ]
+
+
+# ===============================
+# 📈 /metrics
+# ===============================
+@metrics_routes.route("/metrics")
+def metrics():
+    return Response(render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
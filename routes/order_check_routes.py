@@ -4,6 +4,9 @@ from services.order_check_service import load_data, detect_env
 from io import BytesIO
 import pandas as pd
 from datetime import datetime
+from utils.metrics import EXPORT_BYTES
+from config.admission import query_class_scope
+from utils.columnar import wants_columnar, to_columnar
 
 order_check_routes = Blueprint("order_check", __name__, url_prefix="/order-check")
 
@@ -26,6 +29,10 @@ def order_info():
 
     key, vtb, cancel, trade = load_data(env, raw_key)
 
+    # ?format=columnar → 컬럼명 1회 + 행 배열
+    if wants_columnar():
+        vtb, cancel, trade = to_columnar(vtb), to_columnar(cancel), to_columnar(trade)
+
     return jsonify({
         "env": env,
         "key": key,
@@ -43,7 +50,8 @@ def download_excel():
     raw_key = request.args.get("key", "")
     env = detect_env(raw_key)
 
-    key, vtb, cancel, trade = load_data(env, raw_key)
+    with query_class_scope("export"):
+        key, vtb, cancel, trade = load_data(env, raw_key)
 
     output = BytesIO()
     writer = pd.ExcelWriter(output, engine="xlsxwriter")
@@ -54,6 +62,7 @@ def download_excel():
 
     writer.close()
     output.seek(0)
+    EXPORT_BYTES.observe(output.getbuffer().nbytes, kind="order_check")
 
     now = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{key}_{now}.xlsx"
@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
-from services.report_service import report_by_date
+from services.report_service import report_by_date, iter_report_by_date
+from utils.json_stream import stream_json_array
+from utils.columnar import wants_columnar, to_columnar
 
 report_routes = Blueprint("report", __name__)
 
@@ -7,4 +9,15 @@ report_routes = Blueprint("report", __name__)
 def rpt():
     start = request.args.get("start")
     end = request.args.get("end")
-    return jsonify(report_by_date(start, end))
+
+    # ?stream=1 → 서버 측 커서로 조금씩 전송
+    if request.args.get("stream") == "1":
+        return stream_json_array(iter_report_by_date(start, end))
+
+    rows = report_by_date(start, end)
+
+    # ?format=columnar → 컬럼명 1회 + 행 배열
+    if wants_columnar():
+        return jsonify(to_columnar(rows))
+
+    return jsonify(rows)
@@ -0,0 +1,48 @@
+# routes/revenue_routes.py
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+from config.admission import query_class_scope
+from config.db_config import use_replica
+from config.env_registry import ENV_NAMES, normalize_env
+from services.revenue_index import revenue_range, compare_ranges
+
+revenue_routes = Blueprint("revenue", __name__, url_prefix="/api/revenue")
+
+
+def _parse(value):
+    # "2024-01-31" 또는 "2024-01-31 09:00"
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    raise ValueError(f"날짜 형식이 올바르지 않습니다: {value!r} (예: 2024-01-31 또는 2024-01-31 09:00)")
+
+
+# ===============================
+# 💰 임의 구간 매출 합계
+#   /api/revenue/range?start=2024-01-01&end=2024-02-01
+#   + &compare_start=2023-12-01&compare_end=2024-01-01 → 증감률
+# ===============================
+@revenue_routes.route("/range")
+def revenue():
+    env = request.args.get("env", "prod")
+    if env.lower().strip() not in ENV_NAMES:
+        return jsonify({"result": "ERROR", "message": f"알 수 없는 환경: {env!r} ({', '.join(ENV_NAMES)})"}), 400
+    env = normalize_env(env)
+
+    try:
+        start = _parse(request.args.get("start"))
+        end = _parse(request.args.get("end"))
+        compare = request.args.get("compare_start")
+        if compare:
+            previous = (_parse(compare), _parse(request.args.get("compare_end")))
+    except ValueError as e:
+        return jsonify({"result": "ERROR", "message": str(e)}), 400
+
+    with use_replica(True), query_class_scope("dashboard"):
+        if compare:
+            return jsonify(compare_ranges(env, (start, end), previous))
+        return jsonify(revenue_range(env, start, end))
@@ -0,0 +1,88 @@
+"""
+/scripts/bench_json.py
+
+/query/exec 응답(10만 행)을 JSON 프로바이더별로 직렬화해 시간을 비교한다.
+DB 없이 tb_trade 와 비슷한 모양의 행을 만들어 쓴다.
+
+    python -m scripts.bench_json            # 100,000 행
+    python -m scripts.bench_json 20000      # 행 수 지정
+"""
+
+import datetime
+import decimal
+import sys
+import time
+import uuid
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from utils.columnar import to_columnar
+from utils.json_provider import OrjsonProvider, StdJSONProvider, orjson
+
+REPEAT = 3
+
+
+def make_rows(n):
+    base = datetime.datetime(2024, 1, 1)
+    methods = ["CARD", "CASH", "KAKAO", "NAVER"]
+    status = ["DONE", "CANCEL", "READY"]
+    return [
+        {
+            "trade_id": i,
+            "business_order_sheet_id": str(uuid.UUID(int=i)),
+            "pay_method": methods[i % 4],
+            "status": status[i % 3],
+            "amount": decimal.Decimal(1000 + i % 50000),
+            "fee_rate": decimal.Decimal("3.30"),
+            "created_date": base + datetime.timedelta(seconds=i * 37),
+            "memo": None if i % 5 else f"메모 {i}",
+        }
+        for i in range(n)
+    ]
+
+
+def bench(app, payload):
+    best = None
+    size = 0
+    with app.app_context():
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            response = app.json.response(payload)
+            elapsed = time.perf_counter() - start
+            size = len(response.get_data())
+            best = elapsed if best is None else min(best, elapsed)
+    return best, size
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = make_rows(n)
+
+    payloads = {
+        "rows": {"result": "OK", "rows": [{"sql": "SELECT ...", "rows": rows}]},
+        "columnar": {"result": "OK", "rows": [{"sql": "SELECT ...", "rows": to_columnar(rows)}]},
+    }
+
+    providers = [("flask default", DefaultJSONProvider), ("std (repo)", StdJSONProvider)]
+    if orjson is not None:
+        providers.append(("orjson", OrjsonProvider))
+
+    print(f"/query/exec 응답 {n:,} 행, {REPEAT}회 중 최솟값")
+    print(f"{'provider':<15}{'format':<10}{'ms':>10}{'MB':>10}")
+
+    baseline = None
+    for name, cls in providers:
+        app = Flask(__name__)
+        app.json = cls(app)
+        for fmt, payload in payloads.items():
+            # Flask 기본 프로바이더는 Decimal 을 문자열로, datetime 을 HTTP 날짜로 내보낸다
+            elapsed, size = bench(app, payload)
+            if baseline is None:
+                baseline = elapsed
+            print(f"{name:<15}{fmt:<10}{elapsed * 1000:>10.1f}{size / 1e6:>10.2f}"
+                  f"   x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
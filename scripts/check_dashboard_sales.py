@@ -0,0 +1,96 @@
+"""
+/scripts/check_dashboard_sales.py
+
+대시보드 매출(get_two_day_sales)이 쓰는 두 경로가
+기존 4개 쿼리(카드/현금 × 오늘/어제) 결과와 같은지 확인한다.
+
+- 1-query : 조건부 집계 쿼리 (fetch_two_day_sales, SQL_SALES_TWO_DAYS)
+- index   : 매출 누적합 인덱스 (index_two_day_sales, 인덱스가 준비돼 있을 때만)
+
+    python -m scripts.check_dashboard_sales              # prod, 지난 7일
+    python -m scripts.check_dashboard_sales stage 30     # stage, 지난 30일
+
+오늘은 비교 도중 결제가 들어올 수 있어 어제부터 과거로 비교한다.
+하나라도 다르면 exit code 1.
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+from config.db_config import run_query
+from services import revenue_index
+from services.dashboard_service import fetch_two_day_sales, index_two_day_sales
+
+
+# 카드 매출 합계 (기간) - 기존 대시보드 쿼리
+SQL_CARD_SUM = """
+    SELECT SUM(amount) AS total
+    FROM tb_trade
+    WHERE status='PURCHASE_REQUEST'
+      AND account_no IS NULL
+      AND created_date >= %s
+      AND created_date < %s
+"""
+
+# 현금 매출 합계 (기간) - 기존 대시보드 쿼리
+SQL_CASH_SUM = """
+    SELECT SUM(amount) AS total
+    FROM tb_trade
+    WHERE status='DEPOSIT_COMPLETED'
+      AND account_no IS NOT NULL
+      AND created_date >= %s
+      AND created_date < %s
+"""
+
+
+def four_query_sales(env, day):
+    # 기존 방식: 기간 쿼리 4번
+    def total(sql, start):
+        rows = run_query(env, sql, (start, start + timedelta(days=1)))
+        return rows[0]["total"] or 0
+
+    yesterday = day - timedelta(days=1)
+    return {
+        "today": {"card": total(SQL_CARD_SUM, day), "cash": total(SQL_CASH_SUM, day)},
+        "yesterday": {"card": total(SQL_CARD_SUM, yesterday), "cash": total(SQL_CASH_SUM, yesterday)},
+    }
+
+
+def same_sales(expected, actual):
+    # 인덱스는 float 로 합산하므로 숫자로 비교한다 (Decimal vs float)
+    return all(
+        float(expected[day][kind]) == float(actual[day][kind])
+        for day in ("today", "yesterday")
+        for kind in ("card", "cash")
+    )
+
+
+def main():
+    env = sys.argv[1] if len(sys.argv) > 1 else "prod"
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    today = datetime.now().date()
+
+    check_index = revenue_index.is_ready(env)
+    if not check_index:
+        print(f"{env}: 매출 인덱스가 준비되지 않아 1-query 경로만 비교합니다")
+
+    mismatches = 0
+    for i in range(1, days + 1):
+        day = today - timedelta(days=i)
+        expected = four_query_sales(env, day)
+
+        paths = [("1-query", fetch_two_day_sales(env, day))]
+        if check_index:
+            paths.append(("index", index_two_day_sales(env, day)))
+
+        for name, actual in paths:
+            ok = same_sales(expected, actual)
+            mismatches += not ok
+            print(f"{day}  {'OK ' if ok else 'DIFF'}  4-query={expected}  {name}={actual}")
+
+    print(f"{env}: {days}일 중 {mismatches}건 불일치")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,72 +1,94 @@
 # services/dashboard_service.py
 from datetime import datetime, timedelta
-from config.db_config import run_query
-
-
-def get_today_card(env="prod"):
-    sql = """
-        SELECT SUM(amount) AS total
-        FROM tb_trade
-        WHERE status='PURCHASE_REQUEST'
-          AND account_no IS NULL
-          AND created_date >= %s
-          AND created_date < %s
-    """
-    today = datetime.now().date()
-    tomorrow = today + timedelta(days=1)
-    rows = run_query(env, sql, (today, tomorrow))
-    return rows[0]["total"] or 0
-
-
-def get_today_cash(env="prod"):
-    sql = """
-        SELECT SUM(amount) AS total
-        FROM tb_trade
-        WHERE status='DEPOSIT_COMPLETED'
-          AND account_no IS NOT NULL
-          AND created_date >= %s
-          AND created_date < %s
-    """
-    today = datetime.now().date()
-    tomorrow = today + timedelta(days=1)
-    rows = run_query(env, sql, (today, tomorrow))
-    return rows[0]["total"] or 0
-
-
-def get_yesterday_card(env="prod"):
-    sql = """
-        SELECT SUM(amount) AS total
-        FROM tb_trade
-        WHERE status='PURCHASE_REQUEST'
-          AND account_no IS NULL
-          AND created_date >= %s
-          AND created_date < %s
-    """
-    yesterday = datetime.now().date() - timedelta(days=1)
-    today = datetime.now().date()
-    rows = run_query(env, sql, (yesterday, today))
-    return rows[0]["total"] or 0
-
-
-def get_yesterday_cash(env="prod"):
-    sql = """
-        SELECT SUM(amount) AS total
-        FROM tb_trade
-        WHERE status='DEPOSIT_COMPLETED'
-          AND account_no IS NOT NULL
-          AND created_date >= %s
-          AND created_date < %s
-    """
-    yesterday = datetime.now().date() - timedelta(days=1)
+from config.admission import query_class
+from config.db_config import run_query, read_replica
+from services import revenue_index
+from utils.cache import ttl_cache
+
+
+# 오늘 / 어제 카드 · 현금 합계 (이틀 구간 한 번만 스캔)
+SQL_SALES_TWO_DAYS = """
+    SELECT
+        SUM(CASE WHEN created_date >= %(today)s
+                  AND status='PURCHASE_REQUEST' AND account_no IS NULL
+                 THEN amount END) AS today_card,
+        SUM(CASE WHEN created_date >= %(today)s
+                  AND status='DEPOSIT_COMPLETED' AND account_no IS NOT NULL
+                 THEN amount END) AS today_cash,
+        SUM(CASE WHEN created_date < %(today)s
+                  AND status='PURCHASE_REQUEST' AND account_no IS NULL
+                 THEN amount END) AS yesterday_card,
+        SUM(CASE WHEN created_date < %(today)s
+                  AND status='DEPOSIT_COMPLETED' AND account_no IS NOT NULL
+                 THEN amount END) AS yesterday_cash
+    FROM tb_trade
+    WHERE created_date >= %(yesterday)s
+      AND created_date < %(tomorrow)s
+      AND (
+            (status='PURCHASE_REQUEST' AND account_no IS NULL)
+         OR (status='DEPOSIT_COMPLETED' AND account_no IS NOT NULL)
+      )
+"""
+
+
+def two_day_params(day):
+    # day 와 그 전날 (SQL_SALES_TWO_DAYS 파라미터)
+    return {
+        "yesterday": day - timedelta(days=1),
+        "today": day,
+        "tomorrow": day + timedelta(days=1),
+    }
+
+
+def split_two_day_sales(row):
+    # SQL_SALES_TWO_DAYS 결과 1행 → {"today": {"card", "cash"}, "yesterday": {...}}
+    return {
+        "today": {"card": row["today_card"] or 0, "cash": row["today_cash"] or 0},
+        "yesterday": {"card": row["yesterday_card"] or 0, "cash": row["yesterday_cash"] or 0},
+    }
+
+
+def fetch_two_day_sales(env, day):
+    """day 와 전날의 결제수단별 매출 합계를 쿼리 1번으로 가져온다. (캐시 없음)"""
+    rows = run_query(env, SQL_SALES_TWO_DAYS, two_day_params(day))
+    return split_two_day_sales(rows[0])
+
+
+def index_two_day_sales(env, day):
+    """fetch_two_day_sales 와 같은 값을 매출 누적합 인덱스로 계산한다. (인덱스 이후 시간만 조회)"""
+    params = two_day_params(day)
+    today_sales = revenue_index.revenue_range(env, params["today"], params["tomorrow"])
+    yesterday_sales = revenue_index.revenue_range(env, params["yesterday"], params["today"])
+    return {
+        "today": {"card": today_sales["card"], "cash": today_sales["cash"]},
+        "yesterday": {"card": yesterday_sales["card"], "cash": yesterday_sales["cash"]},
+    }
+
+
+@ttl_cache(ttl=60, max_stale=240, daily=True)
+@read_replica
+@query_class("dashboard")
+def get_two_day_sales(env="prod"):
     today = datetime.now().date()
-    rows = run_query(env, sql, (yesterday, today))
-    return rows[0]["total"] or 0
+
+    # 매출 누적합 인덱스가 준비돼 있으면 지난 시간은 O(1), 현재 시간대만 조회
+    if revenue_index.is_ready(env):
+        return index_two_day_sales(env, today)
+
+    return fetch_two_day_sales(env, today)
 
 
 def get_dashboard_sales(env="prod"):
-    today_total = get_today_card(env) + get_today_cash(env)
-    yesterday_total = get_yesterday_card(env) + get_yesterday_cash(env)
+    sales = get_two_day_sales(env)
+    today, yesterday = sales["today"], sales["yesterday"]
+    return summarize_sales(
+        today["card"] + today["cash"],
+        yesterday["card"] + yesterday["cash"]
+    )
+
 
+def summarize_sales(today_total, yesterday_total):
+    # 오늘/어제 합계 → 매출 KPI (전일 대비 증감률)
     if yesterday_total == 0:
         percent = 100 if today_total > 0 else 0
     else:
@@ -1,5 +1,4 @@
-from config.db import query_db
-from utils.json_safe import json_safe
+from config.db import query_db, query_db_iter
 
 def get_dms_by_date(start, end):
     sql = """
@@ -8,8 +7,18 @@ def get_dms_by_date(start, end):
         WHERE LastModifiedDate BETWEEN %s AND %s
         ORDER BY ApprovalType DESC
     """
-    rows = query_db(sql, (f"{start} 00:00:00", f"{end} 23:59:59"))
-    return [json_safe(r) for r in rows]
+    return query_db(sql, (f"{start} 00:00:00", f"{end} 23:59:59"))
+
+
+def iter_dms_by_date(start, end):
+    # get_dms_by_date 의 스트리밍 버전 (한 행씩 반환)
+    sql = """
+        SELECT *
+        FROM vtb_dms_order
+        WHERE LastModifiedDate BETWEEN %s AND %s
+        ORDER BY ApprovalType DESC
+    """
+    return query_db_iter(sql, (f"{start} 00:00:00", f"{end} 23:59:59"), query_class="export")
 
 
 def get_dms_cancel_by_ordersheet(osid):
@@ -20,5 +29,4 @@ def get_dms_cancel_by_ordersheet(osid):
             SELECT TicketID FROM vtb_dms_order WHERE OrderSheetID = %s
         )
     """
-    rows = query_db(sql, (osid,))
-    return [json_safe(r) for r in rows]
+    return query_db(sql, (osid,))
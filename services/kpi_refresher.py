@@ -0,0 +1,224 @@
+"""
+/services/kpi_refresher.py
+
+대시보드 / 결제 분석 / 가입자 분석 KPI 를 백그라운드에서 주기적으로 다시 계산해
+스냅샷으로 저장한다. 화면은 DB 를 기다리지 않고 최신 스냅샷만 읽는다.
+
+- 주기    : KPI_REFRESH_INTERVAL(초), 워커끼리 겹치지 않도록 ±KPI_REFRESH_JITTER 만큼 흔든다
+- 잠금    : env 마다 lease 를 잡은 워커 하나만 계산한다 (같은 서버의 여러 gunicorn 워커)
+- 저장    : 로컬 SQLite (KPI_SNAPSHOT_PATH) → 모든 워커가 같은 스냅샷을 읽는다
+- 스냅샷이 없거나 KPI_SNAPSHOT_MAX_AGE 보다 오래됐으면 None → 라우트가 직접 계산한다
+
+    start_kpi_refresher()              # main.py 에서 1번
+    snap = get_snapshot("prod", "home")
+    snap["value"], snap["age"]
+    get_snapshot_meta("prod", "payment")   # 값 없이 computed_at / age 만
+"""
+
+import logging
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import date, datetime
+
+from services.kpi_service import compute_home_kpis, HOME_KPI_SOURCES
+from services.payment_service import get_trade_metrics
+from services.user_service import get_user_analytics, DEFAULT_USER_WINDOW
+from utils.local_store import LocalStore
+from utils.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+KPI_REFRESH_ENABLED = os.getenv("KPI_REFRESH_ENABLED", "1") == "1"
+KPI_REFRESH_ENVS = tuple(e.strip() for e in os.getenv("KPI_REFRESH_ENVS", "prod").split(",") if e.strip())
+KPI_REFRESH_INTERVAL = float(os.getenv("KPI_REFRESH_INTERVAL", "60"))
+KPI_REFRESH_JITTER = float(os.getenv("KPI_REFRESH_JITTER", "0.2"))
+KPI_SNAPSHOT_MAX_AGE = float(os.getenv("KPI_SNAPSHOT_MAX_AGE", "900"))
+KPI_SNAPSHOT_PATH = os.getenv("KPI_SNAPSHOT_PATH", "data/kpi_snapshot.sqlite3")
+
+
+# ---------------------------------------------------
+# 스냅샷 대상: 이름 → (계산 함수(env), 계산 전에 비울 캐시 함수들)
+# ---------------------------------------------------
+def _user_analytics_default(env):
+    return get_user_analytics(env, DEFAULT_USER_WINDOW)
+
+
+KPI_JOBS = {
+    "home": (compute_home_kpis, HOME_KPI_SOURCES),
+    "payment": (get_trade_metrics, (get_trade_metrics,)),
+    "users": (_user_analytics_default, (get_user_analytics,)),
+}
+
+
+# ---------------------------------------------------
+# SQLite 저장소 (스냅샷 + lease)
+# ---------------------------------------------------
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS snapshot (
+        env         TEXT NOT NULL,
+        name        TEXT NOT NULL,
+        value       BLOB NOT NULL,
+        computed_at REAL NOT NULL,
+        duration    REAL NOT NULL,
+        PRIMARY KEY (env, name)
+    );
+"""
+
+_db = LocalStore(KPI_SNAPSHOT_PATH, _SCHEMA)
+
+def save_snapshot(env, name, value, duration=0.0):
+    with closing(_db.connect()) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO snapshot (env, name, value, computed_at, duration) VALUES (?, ?, ?, ?, ?)",
+            (env, name, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time(), duration),
+        )
+
+
+def _read_snapshot(env, name, max_age, columns):
+    if not KPI_REFRESH_ENABLED:
+        return None
+    max_age = KPI_SNAPSHOT_MAX_AGE if max_age is None else max_age
+
+    try:
+        with closing(_db.connect()) as conn:
+            row = conn.execute(
+                f"SELECT {columns} FROM snapshot WHERE env=? AND name=?", (env, name)
+            ).fetchone()
+    except sqlite3.Error:
+        logger.exception("KPI 스냅샷 조회 실패")
+        return None
+
+    if row is None or time.time() - row["computed_at"] > max_age:
+        return None
+    return row
+
+
+def get_snapshot(env, name, max_age=None):
+    """
+    최신 스냅샷 {"value", "computed_at", "age"} 또는 None.
+    (refresher 가 꺼져 있거나, 아직 없거나, max_age 보다 오래된 경우)
+    """
+    row = _read_snapshot(env, name, max_age, "value, computed_at")
+    if row is None:
+        return None
+    return {"value": pickle.loads(row["value"]), "computed_at": row["computed_at"],
+            "age": time.time() - row["computed_at"]}
+
+
+def get_snapshot_meta(env, name, max_age=None):
+    """값은 읽지 않고 {"computed_at", "age"} 만. (화면 표시 · ETag 용)"""
+    row = _read_snapshot(env, name, max_age, "computed_at")
+    if row is None:
+        return None
+    return {"computed_at": row["computed_at"], "age": time.time() - row["computed_at"]}
+
+
+def format_age(age):
+    """스냅샷 나이(초) → 화면 표시용 문자열"""
+    if age is None:
+        return None
+    if age < 10:
+        return "방금 전 기준"
+    if age < 60:
+        return f"{int(age)}초 전 기준"
+    return f"{int(age // 60)}분 전 기준"
+
+
+# ---------------------------------------------------
+# 갱신
+# ---------------------------------------------------
+def _keep_previous(env, name, value):
+    """
+    KPI 묶음({"sales": {...}, ...}) 중 실패(None 값)한 묶음은 이전 스냅샷 값으로 채운다.
+    (compute_home_kpis 는 실패 / 타임아웃을 예외 대신 None 으로 돌려준다)
+    이전 스냅샷이 오늘 것이 아니면 채우지 않는다. → "오늘" KPI 가 날짜를 넘어가지 않도록
+    """
+    if not isinstance(value, dict):
+        return value
+    failed = [k for k, v in value.items() if isinstance(v, dict) and None in v.values()]
+    if not failed:
+        return value
+
+    previous = get_snapshot(env, name)
+    if previous is None or datetime.fromtimestamp(previous["computed_at"]).date() != date.today():
+        return value
+
+    logger.warning("KPI 일부 계산 실패 (%s/%s: %s) → 이전 스냅샷 값 유지", env, name, ", ".join(failed))
+    merged = dict(value)
+    for key in failed:
+        if key in previous["value"]:
+            merged[key] = previous["value"][key]
+    return merged
+
+
+def refresh(env):
+    """env 의 모든 KPI 스냅샷을 다시 계산한다. (캐시를 비우고 DB 에서 새로 읽는다)"""
+    for name, (compute, sources) in KPI_JOBS.items():
+        start = time.monotonic()
+        try:
+            for func in sources:
+                func.invalidate(env)
+            value = _keep_previous(env, name, compute(env))
+        except Exception:
+            logger.exception("KPI 스냅샷 계산 실패 (%s/%s)", env, name)
+            continue
+        save_snapshot(env, name, value, time.monotonic() - start)
+
+
+def _jittered(interval):
+    return interval * random.uniform(1 - KPI_REFRESH_JITTER, 1 + KPI_REFRESH_JITTER)
+
+
+def _refresh_loop(env):
+    # 워커들이 동시에 시작해도 첫 갱신 시점이 겹치지 않도록
+    time.sleep(random.uniform(0, KPI_REFRESH_INTERVAL * KPI_REFRESH_JITTER))
+
+    while True:
+        try:
+            # lease 는 주기의 3배 → lease 를 잡은 워커가 죽으면 다른 워커가 이어받는다
+            if _db.acquire_lease(f"kpi:{env}", KPI_REFRESH_INTERVAL * 3):
+                refresh(env)
+        except Exception:
+            logger.exception("KPI refresher 오류 (%s)", env)
+        time.sleep(_jittered(KPI_REFRESH_INTERVAL))
+
+
+def start_kpi_refresher():
+    """env 마다 백그라운드 갱신 스레드를 시작한다. (KPI_REFRESH_ENABLED=0 이면 시작하지 않음)"""
+    if not KPI_REFRESH_ENABLED:
+        return []
+    threads = []
+    for env in KPI_REFRESH_ENVS:
+        thread = threading.Thread(target=_refresh_loop, args=(env,), name=f"kpi-refresh-{env}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+# ---------------------------------------------------
+# /metrics
+# ---------------------------------------------------
+@register_collector
+def _collect_snapshots():
+    if not KPI_REFRESH_ENABLED:
+        return []
+    now = time.time()
+    ages, durations = [], []
+    try:
+        with closing(_db.connect()) as conn:
+            rows = conn.execute("SELECT env, name, computed_at, duration FROM snapshot").fetchall()
+    except sqlite3.Error:
+        rows = []
+    for r in rows:
+        labels = {"env": r["env"], "name": r["name"]}
+        ages.append((labels, now - r["computed_at"]))
+        durations.append((labels, r["duration"]))
+    return [
+        ("app_kpi_snapshot_age_seconds", "gauge", "KPI 스냅샷이 만들어진 뒤 지난 시간", ages),
+        ("app_kpi_snapshot_duration_seconds", "gauge", "마지막 KPI 스냅샷 계산 시간", durations),
+    ]
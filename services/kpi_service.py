@@ -0,0 +1,70 @@
+# services/kpi_service.py
+"""
+HOME 대시보드 KPI (매출 / 가입자 / 총 사용자) 계산.
+요청 처리 중에 직접 부르거나, kpi_refresher 가 주기적으로 불러 스냅샷으로 저장한다.
+"""
+
+from services.dashboard_service import get_dashboard_sales, get_two_day_sales
+from services.user_service import get_today_users, get_yesterday_users, get_total_users
+from utils.fanout import fan_out
+
+# HOME KPI 전체를 기다리는 최대 시간(초) (fan_out 마감, 풀 대기 시간 포함)
+HOME_KPI_TIMEOUT = 5
+
+# 스냅샷을 새로 만들 때 비워야 하는 캐시 함수
+HOME_KPI_SOURCES = (get_two_day_sales, get_today_users, get_yesterday_users, get_total_users)
+
+
+def compute_home_kpis(env="prod"):
+    """{"sales", "user_kpi", "user_total_kpi"} — 실패한 KPI 는 None (화면에 "-" 표시)"""
+
+    # ----------------------
+    # 0) KPI 쿼리 동시 실행
+    # ----------------------
+    kpi = fan_out({
+        "sales": (get_dashboard_sales, env),
+        "today_users": (get_today_users, env),
+        "yesterday_users": (get_yesterday_users, env),
+        "total_users": (get_total_users, env),
+    }, timeout=HOME_KPI_TIMEOUT)
+
+    # ----------------------
+    # 1) 매출 KPI (오늘 / 어제 × 카드 / 현금 → 쿼리 1번)
+    # ----------------------
+    sales = kpi["sales"]
+
+    if sales is None:
+        sales = {"today_sales": None, "yesterday_sales": None, "percent": None, "is_up": None}
+
+    # ----------------------
+    # 2) 오늘 / 어제 가입자 수
+    # ----------------------
+    today_users = kpi["today_users"]
+    yesterday_users = kpi["yesterday_users"]
+
+    if today_users is None or yesterday_users is None:
+        user_percent = None
+    elif yesterday_users == 0:
+        user_percent = 100 if today_users > 0 else 0
+    else:
+        user_percent = round(((today_users - yesterday_users) / yesterday_users) * 100, 1)
+
+    user_kpi = {
+        "today": today_users,
+        "yesterday": yesterday_users,
+        "percent": user_percent,
+        "is_up": user_percent is not None and today_users >= yesterday_users
+    }
+
+    # ----------------------
+    # 3) 총 사용자 수 KPI
+    # ----------------------
+    total_users = kpi["total_users"]
+
+    user_total_kpi = {
+        "total": total_users,
+        "delta": today_users,
+        "is_up": bool(today_users)
+    }
+
+    return {"sales": sales, "user_kpi": user_kpi, "user_total_kpi": user_total_kpi}
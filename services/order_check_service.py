@@ -1,35 +1,6 @@
 # services/order_check_service.py
 
-import pymysql
-import os
-import base64
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# =============================
-# DB 설정
-# =============================
-DB_STAGE = {
-    "host": os.getenv("STAGE_DB_HOST"),
-    "port": int(os.getenv("STAGE_DB_PORT")),
-    "user": os.getenv("STAGE_DB_USER"),
-    "password": os.getenv("STAGE_DB_PASSWORD"),
-    "database": os.getenv("STAGE_DB_NAME"),
-    "cursorclass": pymysql.cursors.DictCursor,
-    "charset": "utf8mb4"
-}
-
-DB_PROD = {
-    "host": os.getenv("PROD_DB_HOST"),
-    "port": int(os.getenv("PROD_DB_PORT")),
-    "user": os.getenv("PROD_DB_USER"),
-    "password": os.getenv("PROD_DB_PASSWORD"),
-    "database": os.getenv("PROD_DB_NAME"),
-    "cursorclass": pymysql.cursors.DictCursor,
-    "charset": "utf8mb4"
-}
-
+from config.db_config import run_query
 
 # =============================
 # 환경 자동 판별
@@ -48,33 +19,11 @@ def detect_env(raw):
     return "prod"   # 기본 prod 사용
 
 
-# =============================
-# 안전한 JSON 변환
-# =============================
-def make_json_safe(row):
-    safe = {}
-    for k, v in row.items():
-        if isinstance(v, bytes):
-            try:
-                safe[k] = v.decode("utf-8", errors="replace")
-            except:
-                safe[k] = base64.b64encode(v).decode("utf-8")
-        else:
-            safe[k] = v
-    return safe
-
-
 # =============================
 # DB 조회 공통 함수
 # =============================
 def query_db(env, sql, params=None):
-    config = DB_PROD if env == "prod" else DB_STAGE
-    conn = pymysql.connect(**config)
-    with conn:
-        with conn.cursor() as cursor:
-            cursor.execute(sql, params)
-            rows = cursor.fetchall()
-            return [make_json_safe(r) for r in rows]
+    return run_query(env, sql, params)
 
 
 # =============================
@@ -1,170 +1,187 @@
 # services/payment_service.py
 from datetime import datetime, timedelta
-from config.db_config import run_query
+from config.admission import query_class
+from config.db_config import run_query, read_replica
+from services import rollup_service
+from utils.cache import ttl_cache
+from utils.day_cache import get_days
 
 
 # ---------------------------------------------------
-# 최근 7일 매출 (카드 + 현금)
+# SQL
+#   카드: status='PURCHASE_REQUEST' AND account_no IS NULL
+#   현금: status='DEPOSIT_COMPLETED' AND account_no IS NOT NULL
 # ---------------------------------------------------
-def get_daily_sales(env="prod"):
+
+# 결제수단 × 시간대 집계 (전체 기간, 스캔 1번)
+#   WITH ROLLUP → (수단, 시간대) 행 + 수단별 합계(hr NULL) + 전체 합계(is_card NULL)
+SQL_TRADE_BY_METHOD_HOUR = """
+    SELECT account_no IS NULL AS is_card,
+           HOUR(created_date) AS hr,
+           COUNT(*) AS cnt,
+           SUM(amount) AS total
+    FROM tb_trade
+    WHERE (status='PURCHASE_REQUEST' AND account_no IS NULL)
+       OR (status='DEPOSIT_COMPLETED' AND account_no IS NOT NULL)
+    GROUP BY is_card, hr WITH ROLLUP
+"""
+
+# 일별 매출 합계 (카드 + 현금, 기간)
+SQL_TRADE_DAILY = """
+    SELECT DATE(created_date) AS day, SUM(amount) AS total
+    FROM tb_trade
+    WHERE created_date >= %s AND created_date < %s
+      AND (
+            (status='PURCHASE_REQUEST' AND account_no IS NULL)
+         OR (status='DEPOSIT_COMPLETED' AND account_no IS NOT NULL)
+      )
+    GROUP BY DATE(created_date)
+"""
+
+
+def last_7_days():
+    # 오늘 포함 최근 7일 (day, next_day) 목록
     today = datetime.now().date()
-    result = []
+    days = [today - timedelta(days=6 - i) for i in range(7)]
+    return [(day, day + timedelta(days=1)) for day in days]
 
-    for i in range(7):
-        day = today - timedelta(days=6 - i)
-        next_day = day + timedelta(days=1)
-
-        # 카드
-        sql_card = """
-            SELECT SUM(amount) AS total
-            FROM tb_trade
-            WHERE status='PURCHASE_REQUEST'
-              AND account_no IS NULL
-              AND created_date >= %s AND created_date < %s
-        """
-
-        # 현금
-        sql_cash = """
-            SELECT SUM(amount) AS total
-            FROM tb_trade
-            WHERE status='DEPOSIT_COMPLETED'
-              AND account_no IS NOT NULL
-              AND created_date >= %s AND created_date < %s
-        """
-
-        card = run_query(env, sql_card, (day, next_day))[0]["total"] or 0
-        cash = run_query(env, sql_cash, (day, next_day))[0]["total"] or 0
-
-        result.append({
-            "date": day.strftime("%m/%d"),
-            "total": card + cash
-        })
 
-    return result
+# 매출로 치는 status (is_card → status)
+SALE_STATUS = {1: "PURCHASE_REQUEST", 0: "DEPOSIT_COMPLETED"}
 
 
-# ---------------------------------------------------
-# 결제수단별 매출액 비율
-# ---------------------------------------------------
-def get_payment_amount(env="prod"):
-    sql_card = """
-        SELECT SUM(amount) AS total
-        FROM tb_trade
-        WHERE status='PURCHASE_REQUEST'
-          AND account_no IS NULL
+def rollup_method_hour_rows(rows):
     """
-    sql_cash = """
-        SELECT SUM(amount) AS total
-        FROM tb_trade
-        WHERE status='DEPOSIT_COMPLETED'
-          AND account_no IS NOT NULL
+    rollup_service.trade_rollup(by="hour") 결과 → SQL_TRADE_BY_METHOD_HOUR 와 같은 모양
+    (수단 × 시간대 행 + 수단별 합계 행)
     """
+    result = []
+    subtotal = {}
 
-    card = run_query(env, sql_card)[0]["total"] or 0
-    cash = run_query(env, sql_cash)[0]["total"] or 0
+    for r in rows:
+        if SALE_STATUS.get(r["is_card"]) != r["status"]:
+            continue
+        result.append({"is_card": r["is_card"], "hr": r["key"], "cnt": r["cnt"], "total": r["total"]})
+        cnt, total = subtotal.get(r["is_card"], (0, 0))
+        subtotal[r["is_card"]] = (cnt + r["cnt"], total + r["total"])
 
-    return {"card": card, "cash": cash}
+    for is_card, (cnt, total) in subtotal.items():
+        result.append({"is_card": is_card, "hr": None, "cnt": cnt, "total": total})
 
+    return result
 
-# ---------------------------------------------------
-# 결제수단별 매출 건수 비율
-# ---------------------------------------------------
-def get_payment_count(env="prod"):
-    sql_card = """
-        SELECT COUNT(*) AS cnt
-        FROM tb_trade
-        WHERE status='PURCHASE_REQUEST'
-          AND account_no IS NULL
-    """
 
-    sql_cash = """
-        SELECT COUNT(*) AS cnt
-        FROM tb_trade
-        WHERE status='DEPOSIT_COMPLETED'
-          AND account_no IS NOT NULL
-    """
+def rollup_daily_rows(rows):
+    # rollup_service.trade_rollup(by="day") 결과 → SQL_TRADE_DAILY 와 같은 모양
+    totals = {}
+    for r in rows:
+        if SALE_STATUS.get(r["is_card"]) == r["status"]:
+            totals[r["key"]] = totals.get(r["key"], 0) + r["total"]
+    return [{"day": day, "total": total} for day, total in totals.items()]
 
-    card = run_query(env, sql_card)[0]["cnt"] or 0
-    cash = run_query(env, sql_cash)[0]["cnt"] or 0
 
-    return {"card": card, "cash": cash}
+def fetch_daily_sales(env, start, end):
+    """[start, end) 일별 매출 합계 {date: 합계} (rollup 이 준비돼 있으면 rollup 사용)"""
+    if rollup_service.is_ready(env, "trade"):
+        rows = rollup_daily_rows(rollup_service.trade_rollup(env, start, end, by="day"))
+    else:
+        rows = run_query(env, SQL_TRADE_DAILY, (start, end))
+    return {r["day"]: r["total"] or 0 for r in rows}
+
+
+def build_trade_metrics(method_hour_rows, daily_rows, days):
+    """
+    두 집계 결과 → /payment-analytics 에 필요한 5개 데이터셋.
+    결과가 없는 날짜 / 시간대는 0 으로 채운다.
+    """
+    amount = {"card": 0, "cash": 0}
+    count = {"card": 0, "cash": 0}
+    hourly_total = [0] * 24
+    hourly_count = [0] * 24
+
+    for r in method_hour_rows:
+        if r["is_card"] is None:
+            continue  # 전체 합계 (ROLLUP)
+
+        method = "card" if r["is_card"] else "cash"
+        if r["hr"] is None:
+            # 결제수단별 합계 (ROLLUP)
+            amount[method] = r["total"] or 0
+            count[method] = r["cnt"] or 0
+            continue
+
+        hourly_total[r["hr"]] += r["total"] or 0
+        hourly_count[r["hr"]] += r["cnt"] or 0
+
+    totals = {r["day"]: r["total"] or 0 for r in daily_rows}
+
+    return {
+        "daily": [
+            {"date": day.strftime("%m/%d"), "total": totals.get(day, 0)}
+            for day, _ in days
+        ],
+        "amount": amount,
+        "count": count,
+        "hourly_sales": [{"hour": h, "total": hourly_total[h]} for h in range(24)],
+        "hourly_count": [{"hour": h, "count": hourly_count[h]} for h in range(24)],
+    }
 
 
 # ---------------------------------------------------
-# 🔥 시간대별 매출액 (카드 + 현금)
+# 결제 분석 전체 (쿼리 2번, rollup 사용 시 현재 시간대 조회만)
 # ---------------------------------------------------
-def get_hourly_sales(env="prod"):
+@ttl_cache(ttl=300, max_stale=900, daily=True)
+@read_replica
+@query_class("dashboard")
+def get_trade_metrics(env="prod"):
+    days = last_7_days()
 
-    # 카드
-    sql_card = """
-        SELECT HOUR(created_date) AS hr, SUM(amount) AS total
-        FROM tb_trade
-        WHERE status='PURCHASE_REQUEST'
-          AND account_no IS NULL
-        GROUP BY HOUR(created_date)
-        ORDER BY hr;
-    """
-
-    # 현금
-    sql_cash = """
-        SELECT HOUR(created_date) AS hr, SUM(amount) AS total
-        FROM tb_trade
-        WHERE status='DEPOSIT_COMPLETED'
-          AND account_no IS NOT NULL
-        GROUP BY HOUR(created_date)
-        ORDER BY hr;
-    """
+    # 시간 단위 rollup 이 준비돼 있으면 전체 스캔 대신 rollup + 현재 시간대만 조회
+    if rollup_service.is_ready(env, "trade"):
+        method_hour_rows = rollup_method_hour_rows(rollup_service.trade_rollup(env, by="hour"))
+    else:
+        method_hour_rows = run_query(env, SQL_TRADE_BY_METHOD_HOUR)
 
-    rows_card = run_query(env, sql_card)
-    rows_cash = run_query(env, sql_cash)
+    # 지난 날짜는 일자별 캐시, 오늘 + 정정 구간만 조회
+    daily_rows = [
+        {"day": day, "total": total}
+        for day, total in get_days("trade_daily_sales", env, [day for day, _ in days], fetch_daily_sales,
+                                   correction_days=rollup_service.ROLLUP_RESYNC_DAYS)
+    ]
 
-    map_card = {r["hr"]: r["total"] for r in rows_card}
-    map_cash = {r["hr"]: r["total"] for r in rows_cash}
+    return build_trade_metrics(method_hour_rows, daily_rows, days)
 
-    result = []
-    for h in range(24):
-        result.append({
-            "hour": h,
-            "total": (map_card.get(h, 0) or 0) + (map_cash.get(h, 0) or 0)
-        })
 
-    return result
+# ---------------------------------------------------
+# 최근 7일 매출 (카드 + 현금)
+# ---------------------------------------------------
+def get_daily_sales(env="prod"):
+    return get_trade_metrics(env)["daily"]
 
 
 # ---------------------------------------------------
-# 🔥 시간대별 매출 횟수 (카드 + 현금)
+# 결제수단별 매출액 비율
 # ---------------------------------------------------
-def get_hourly_sales_count(env="prod"):
+def get_payment_amount(env="prod"):
+    return get_trade_metrics(env)["amount"]
 
-    sql_card = """
-        SELECT HOUR(created_date) AS hr, COUNT(*) AS cnt
-        FROM tb_trade
-        WHERE status='PURCHASE_REQUEST'
-          AND account_no IS NULL
-        GROUP BY HOUR(created_date)
-        ORDER BY hr;
-    """
 
-    sql_cash = """
-        SELECT HOUR(created_date) AS hr, COUNT(*) AS cnt
-        FROM tb_trade
-        WHERE status='DEPOSIT_COMPLETED'
-          AND account_no IS NOT NULL
-        GROUP BY HOUR(created_date)
-        ORDER BY hr;
-    """
+# ---------------------------------------------------
+# 결제수단별 매출 건수 비율
+# ---------------------------------------------------
+def get_payment_count(env="prod"):
+    return get_trade_metrics(env)["count"]
 
-    rows_card = run_query(env, sql_card)
-    rows_cash = run_query(env, sql_cash)
 
-    map_card = {r["hr"]: r["cnt"] for r in rows_card}
-    map_cash = {r["hr"]: r["cnt"] for r in rows_cash}
+# ---------------------------------------------------
+# 🔥 시간대별 매출액 (카드 + 현금)
+# ---------------------------------------------------
+def get_hourly_sales(env="prod"):
+    return get_trade_metrics(env)["hourly_sales"]
 
-    result = []
-    for h in range(24):
-        result.append({
-            "hour": h,
-            "count": (map_card.get(h, 0) or 0) + (map_cash.get(h, 0) or 0)
-        })
 
-    return result
+# ---------------------------------------------------
+# 🔥 시간대별 매출 횟수 (카드 + 현금)
+# ---------------------------------------------------
+def get_hourly_sales_count(env="prod"):
+    return get_trade_metrics(env)["hourly_count"]
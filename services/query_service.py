@@ -1,8 +1,33 @@
-import pandas as pd
-import base64
+import logging
+import os
 import re
+import threading
+import time
+import uuid
 from io import BytesIO
-from config.db_config import run_query
+from openpyxl import Workbook
+import pymysql
+from config.admission import query_class_scope
+from config.query_log import ADHOC_TAG
+from config.db_config import run_query, run_query_iter, use_replica, get_env_pools
+
+logger = logging.getLogger(__name__)
+
+# 엑셀 다운로드 시 서버 측 커서에서 한 번에 읽어올 행 수
+EXPORT_CHUNK_SIZE = 1000
+
+# 스크립트 한 번 실행에 허용하는 최대 시간(초)
+ADHOC_QUERY_TIMEOUT = int(os.getenv("ADHOC_QUERY_TIMEOUT", "60"))
+ADHOC_EXPORT_TIMEOUT = int(os.getenv("ADHOC_EXPORT_TIMEOUT", "300"))
+
+# MAX_EXECUTION_TIME 초과(3024) / KILL QUERY 로 중단(1317)
+ABORTED_ERROR_CODES = (3024, 1317)
+
+# 데이터를 바꾸거나 잠그는 문장 (하나라도 있으면 primary 에서 실행)
+WRITE_RE = re.compile(
+    r"\b(insert|update|delete|replace|merge|create|alter|drop|truncate|rename|grant|revoke|lock|unlock|call|load|handler|do)\b",
+    re.IGNORECASE
+)
 
 # 엑셀에서 불가능한 문자 제거
 ILLEGAL_RE = re.compile(r"[\x00-\x08\x0B-\x1F\x7F]")
@@ -13,28 +38,15 @@ def clean_excel_value(v):
     return v
 
 
-def make_json_safe(row):
-    safe = {}
-    for k, v in row.items():
-        if isinstance(v, bytes):
-            try:
-                v = v.decode("utf-8", errors="replace")
-            except:
-                v = base64.b64encode(v).decode("utf-8")
-
-        safe[k] = clean_excel_value(v)
-    return safe
-
-
 # ================================
-# SET 문 자동 처리 + 여러 SELECT 결과 모두 반환
+# SET 문 자동 처리 → 실행할 SELECT 문 목록 반환
 # ================================
-def run_sql_query(sql: str, env: str):
+def split_statements(sql: str):
 
     stmts = [s.strip() for s in sql.split(";") if s.strip()]
 
     session_vars = {}
-    all_results = []
+    processed = []
 
     for stmt in stmts:
 
@@ -59,33 +71,242 @@ def run_sql_query(sql: str, env: str):
         for k, v in session_vars.items():
             processed_sql = processed_sql.replace(k, f"'{v}'")
 
-        # 실행
-        rows = run_query(env, processed_sql)
-        result = [make_json_safe(r) for r in rows]
+        processed.append(processed_sql)
+
+    return processed
+
+
+# ================================
+# 실행 시간 제한 + 취소
+#   - SELECT 문에는 MAX_EXECUTION_TIME 힌트를 넣어 서버가 스스로 멈추게 하고
+#   - 그 외 문장 / 스트리밍은 watchdog 이 KILL QUERY 를 보낸다.
+#   - 실행 중인 문장에는 /* adhoc:<run_id> */ 태그를 붙여
+#     KILL 대상이 정말 이 스크립트의 쿼리인지 PROCESSLIST 로 확인한다.
+# ================================
+class QueryAborted(Exception):
+    """시간 초과 또는 사용자 취소로 중단된 스크립트"""
+
+
+_runs = {}                      # run_id → AdhocRun
+_runs_lock = threading.Lock()
+
+_SELECT_RE = re.compile(r"^\s*select\b", re.IGNORECASE)
+
+
+def _clean_run_id(run_id):
+    # 태그 / LIKE 패턴에 들어가므로 영숫자 · _ · - 만 남긴다
+    return re.sub(r"[^0-9A-Za-z_-]", "", run_id or "")[:64]
+
+
+def _budget(requested, maximum):
+    # 요청한 제한 시간(초)을 1 ~ maximum 으로 맞춘다
+    try:
+        value = float(requested)
+    except (TypeError, ValueError):
+        return maximum
+    return min(max(value, 1), maximum)
+
+
+class AdhocRun:
+    """ad-hoc 스크립트 한 번의 실행 (제한 시간 · 취소 상태 관리)"""
+
+    def __init__(self, run_id, env, timeout):
+        self.run_id = _clean_run_id(run_id) or uuid.uuid4().hex
+        self.env = env
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout
+        self.state = "running"          # running / timeout / cancelled
+        self.conn_id = None
+        self.pool = None
+        self._lock = threading.Lock()
+        self._timer = threading.Timer(timeout, self.abort, ("timeout",))
+        self._timer.daemon = True
+
+    def __enter__(self):
+        with _runs_lock:
+            # 같은 run_id 로 덮어쓰면 먼저 실행 중인 쿼리를 취소할 수 없게 된다
+            if self.run_id in _runs:
+                raise QueryAborted(f"이미 실행 중인 run_id 입니다: {self.run_id}")
+            _runs[self.run_id] = self
+        self._timer.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._timer.cancel()
+        with _runs_lock:
+            _runs.pop(self.run_id, None)
+
+        if isinstance(exc, pymysql.err.OperationalError):
+            if exc.args and exc.args[0] == 3024:
+                self.state = "timeout"
+            if self.state != "running" or (exc.args and exc.args[0] in ABORTED_ERROR_CODES):
+                raise QueryAborted(self.message()) from exc
+        return False
+
+    def message(self):
+        if self.state == "cancelled":
+            return "사용자가 실행을 취소했습니다."
+        if self.state == "running":
+            # 다른 워커의 cancel_query 가 KILL QUERY 로 멈춘 경우
+            return "실행이 중단되었습니다. (취소 또는 서버에서 종료)"
+        return f"실행 시간 초과 ({self.timeout:g}초)"
+
+    def prepare(self, stmt):
+        """남은 시간으로 MAX_EXECUTION_TIME 힌트와 추적 태그를 붙인다."""
+        remaining_ms = int((self.deadline - time.monotonic()) * 1000)
+        if remaining_ms <= 0:
+            self.state = "timeout"
+        if self.state != "running":
+            raise QueryAborted(self.message())
+
+        if _SELECT_RE.match(stmt) and "MAX_EXECUTION_TIME" not in stmt.upper():
+            stmt = _SELECT_RE.sub(f"SELECT /*+ MAX_EXECUTION_TIME({remaining_ms}) */", stmt, count=1)
+
+        return f"{ADHOC_TAG}{self.run_id} */ {stmt}"
 
-        all_results.append({
-            "sql": processed_sql,
-            "rows": result
-        })
+    def on_connect(self, conn_id, pool):
+        # run_query 가 커넥션을 얻은 직후 호출 → KILL 대상 기록
+        with self._lock:
+            if self.state != "running":
+                raise QueryAborted(self.message())
+            self.conn_id = conn_id
+            self.pool = pool
+
+    def abort(self, state):
+        """실행 중인 쿼리를 KILL QUERY 로 멈춘다. 이미 끝났으면 False."""
+        with self._lock:
+            if self.state != "running":
+                return False
+            self.state = state
+            conn_id, pool = self.conn_id, self.pool
+
+        if pool is not None:
+            try:
+                _kill_tagged(pool, self.run_id, conn_id)
+            except Exception as e:
+                logger.warning("KILL QUERY 실패 (run_id=%s): %r", self.run_id, e)
+        return True
+
+
+def _like_escape(value):
+    # LIKE 와일드카드(% _)와 이스케이프 문자를 글자 그대로 비교하게 한다
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _kill_tagged(pool, run_id, conn_id=None):
+    """
+    run_id 태그가 붙은 실행 중인 문장을 KILL QUERY 한다. 멈춘 개수를 반환한다.
+    conn_id 를 모르면 (다른 워커에서 실행 중) 태그만으로 PROCESSLIST 에서 찾는다.
+    """
+    sql = """
+        SELECT ID
+        FROM information_schema.PROCESSLIST
+        WHERE INFO LIKE %s AND ID <> CONNECTION_ID()
+    """
+    params = [f"{ADHOC_TAG}{_like_escape(run_id)} */%"]
+    if conn_id is not None:
+        sql += " AND ID = %s"
+        params.append(conn_id)
+
+    conn = pool.connect_unpooled()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            ids = [row["ID"] for row in cur.fetchall()]
+            for thread_id in ids:
+                cur.execute("KILL QUERY %s", (thread_id,))
+    finally:
+        conn.close()
+    return len(ids)
+
+
+def cancel_query(run_id, env="prod"):
+    """
+    실행 중인 스크립트를 취소한다. 취소했으면 True
+    이 프로세스에서 실행 중이 아니면 (다른 gunicorn 워커) env 의 모든 풀에서 태그로 찾아 멈춘다.
+    """
+    with _runs_lock:
+        run = _runs.get(_clean_run_id(run_id))
+    if run is not None:
+        return run.abort("cancelled")
+
+    run_id = _clean_run_id(run_id)
+    if not run_id:
+        return False
+
+    killed = 0
+    for pool in get_env_pools(env):
+        try:
+            killed += _kill_tagged(pool, run_id)
+        except Exception as e:
+            logger.warning("KILL QUERY 실패 (run_id=%s): %r", run_id, e)
+    return killed > 0
+
+
+# ================================
+# SELECT 만 있는 스크립트인지 확인 (→ read replica 로 실행)
+# ================================
+def is_read_only(statements):
+    return all(not WRITE_RE.search(stmt) for stmt in statements)
+
+
+# ================================
+# 여러 SELECT 결과 모두 반환
+# ================================
+def run_sql_query(sql: str, env: str, run_id=None, timeout=None):
+
+    statements = split_statements(sql)
+    all_results = []
+
+    with AdhocRun(run_id, env, _budget(timeout, ADHOC_QUERY_TIMEOUT)) as run:
+        with use_replica(is_read_only(statements)), query_class_scope("adhoc"):
+            for processed_sql in statements:
+
+                # 실행
+                rows = run_query(env, run.prepare(processed_sql), on_connect=run.on_connect)
+
+                all_results.append({
+                    "sql": processed_sql,
+                    "rows": rows
+                })
 
     return all_results   # 여러 결과 반환
 
 
 # ================================
 # 여러 개 SELECT → 시트 여러개 생성
+# (서버 측 커서 + write-only 워크북으로 결과를 메모리에 다 올리지 않는다)
 # ================================
-def export_to_excel(sql: str, env: str):
-
-    results = run_sql_query(sql, env)
-    output = BytesIO()
+def export_to_excel(sql: str, env: str, run_id=None, timeout=None):
 
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        for idx, item in enumerate(results):
-            df = pd.DataFrame(item["rows"])
-            if df.empty:
-                df = pd.DataFrame({"message": ["데이터 없음"]})
+    wb = Workbook(write_only=True)
+    statements = split_statements(sql)
 
-            df.to_excel(writer, sheet_name=f"result_{idx+1}", index=False)
+    with AdhocRun(run_id, env, _budget(timeout, ADHOC_EXPORT_TIMEOUT)) as run:
+        with use_replica(is_read_only(statements)), query_class_scope("export"):
+            _write_sheets(wb, statements, env, run)
 
+    output = BytesIO()
+    wb.save(output)
     output.seek(0)
     return output
+
+
+def _write_sheets(wb, statements, env, run):
+    for idx, processed_sql in enumerate(statements):
+        ws = wb.create_sheet(title=f"result_{idx+1}")
+        header = None
+
+        rows_iter = run_query_iter(
+            env, run.prepare(processed_sql), chunk_size=EXPORT_CHUNK_SIZE, on_connect=run.on_connect
+        )
+        for chunk in rows_iter:
+            for row in chunk:
+                if header is None:
+                    header = list(row.keys())
+                    ws.append(header)
+                ws.append([clean_excel_value(row[k]) for k in header])
+
+        if header is None:
+            ws.append(["message"])
+            ws.append(["데이터 없음"])
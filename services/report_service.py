@@ -1,5 +1,4 @@
-from config.db import query_db
-from utils.json_safe import json_safe
+from config.db import query_db, query_db_iter
 
 def report_by_date(start, end):
     sql = """
@@ -7,5 +6,14 @@ def report_by_date(start, end):
         FROM tb_business_order_sheet
         WHERE last_modified_date BETWEEN %s AND %s
     """
-    rows = query_db(sql, (f"{start} 00:00:00", f"{end} 23:59:59"))
-    return [json_safe(r) for r in rows]
+    return query_db(sql, (f"{start} 00:00:00", f"{end} 23:59:59"))
+
+
+def iter_report_by_date(start, end):
+    # report_by_date 의 스트리밍 버전 (한 행씩 반환)
+    sql = """
+        SELECT *
+        FROM tb_business_order_sheet
+        WHERE last_modified_date BETWEEN %s AND %s
+    """
+    return query_db_iter(sql, (f"{start} 00:00:00", f"{end} 23:59:59"), query_class="export")
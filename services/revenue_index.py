@@ -0,0 +1,253 @@
+"""
+/services/revenue_index.py
+
+시간 단위 매출 누적합(prefix sum) 인덱스. (env 별 파일, mmap 으로 읽기)
+
+slot i = 인덱스 시작 시각부터 i 시간 동안의 누적 (카드 금액, 현금 금액, 카드 건수, 현금 건수).
+임의 구간 [a, b) 의 합계는 slot[b] - slot[a] → 기간 길이와 상관없이 O(1).
+
+- 원본   : rollup_service 의 trade_hourly (tb_trade 시간 버킷, 매출 status 만)
+- 갱신   : rollup 동기화가 끝날 때마다 watermark 까지 새 시간을 이어 붙인다
+           (rollup 이 다시 집계하는 최근 ROLLUP_RESYNC_DAYS 일은 매번 새로 쌓는다)
+           (새 파일을 쓰고 os.replace → 읽는 쪽은 항상 완성된 파일만 본다)
+- 꼬리   : 인덱스 끝(= rollup watermark) 이후 구간은 tb_trade 에서 직접 합계를 읽는다
+- 단위   : 시간. 정시가 아닌 시작 / 끝의 자투리 시간도 tb_trade 에서 직접 합계를 읽는다.
+
+    revenue_range("prod", datetime(2024, 1, 1), datetime(2024, 2, 1))
+    → {"card": ..., "cash": ..., "card_count": ..., "cash_count": ..., "total": ..., "count": ...}
+
+파일 형식: 헤더 32 bytes (magic, version, 시작 시각(시간 번호), slot 수) + slot 마다 float64 × 4
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime, timedelta
+
+from config.db_config import run_query
+from services import rollup_service
+from services.payment_service import SALE_STATUS
+
+logger = logging.getLogger(__name__)
+
+REVENUE_INDEX_DIR = os.getenv("REVENUE_INDEX_DIR", "data")
+
+MAGIC = b"RVIX"
+VERSION = 1
+HEADER = struct.Struct("<4sIqq")
+HEADER_SIZE = 32
+FIELDS = ("card", "cash", "card_count", "cash_count")
+SLOT_SIZE = 8 * len(FIELDS)
+
+
+# 인덱스 끝 이후(live tail) 결제수단별 합계
+SQL_SALES_BY_METHOD = """
+    SELECT account_no IS NULL AS is_card, COUNT(*) AS cnt, SUM(amount) AS total
+    FROM tb_trade
+    WHERE created_date >= %s
+      AND created_date < %s
+      AND (
+            (status='PURCHASE_REQUEST' AND account_no IS NULL)
+         OR (status='DEPOSIT_COMPLETED' AND account_no IS NOT NULL)
+      )
+    GROUP BY is_card
+"""
+
+
+def hour_no(dt):
+    # datetime → 시간 번호 (정시 내림)
+    if not isinstance(dt, datetime):
+        dt = datetime(dt.year, dt.month, dt.day)
+    return dt.toordinal() * 24 + dt.hour
+
+
+def from_hour_no(h):
+    return datetime.fromordinal(h // 24) + timedelta(hours=h % 24)
+
+
+def _path(env):
+    return os.path.join(REVENUE_INDEX_DIR, f"revenue_{env}.idx")
+
+
+# ---------------------------------------------------
+# 읽기 (mmap)
+# ---------------------------------------------------
+class _Mapped:
+    """열려 있는 인덱스 파일 하나. 파일이 교체되면 새로 연다."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.stat = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.base, self.slots = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"revenue index 형식이 다릅니다: {path}")
+        self._view = memoryview(self._mm)[HEADER_SIZE:HEADER_SIZE + self.slots * SLOT_SIZE].cast("d")
+
+    @property
+    def end(self):
+        # 인덱스가 덮는 마지막 시각 (이 시간 번호 미만까지)
+        return self.base + self.slots - 1
+
+    def prefix(self, h):
+        i = min(max(h, self.base), self.end) - self.base
+        return tuple(self._view[i * len(FIELDS):(i + 1) * len(FIELDS)])
+
+    def raw_slots(self):
+        return bytes(self._mm[HEADER_SIZE:HEADER_SIZE + self.slots * SLOT_SIZE])
+
+
+_lock = threading.Lock()
+_mapped = {}
+
+
+def _open(env):
+    path = _path(env)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    with _lock:
+        current = _mapped.get(env)
+        if current is not None and (current.stat.st_ino, current.stat.st_size, current.stat.st_mtime_ns) == \
+                (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+            return current
+        # 이전 매핑은 참조가 없어지면 닫힌다 (읽는 중인 스레드가 있을 수 있음)
+        current = _mapped[env] = _Mapped(path)
+        return current
+
+
+def is_ready(env):
+    """인덱스가 있고 rollup 기준으로 너무 밀려 있지 않은지."""
+    try:
+        idx = _open(env)
+    except (OSError, ValueError):
+        logger.exception("revenue index 열기 실패 (%s)", env)
+        return False
+    if idx is None:
+        return False
+    lag = datetime.now() - from_hour_no(idx.end)
+    return lag < timedelta(hours=rollup_service.ROLLUP_MAX_LAG_HOURS)
+
+
+def _num(v):
+    # 화면 표시용: 정수면 int
+    v = float(v)
+    return int(v) if v.is_integer() else v
+
+
+def _ceil_hour_no(dt):
+    h = hour_no(dt)
+    return h if from_hour_no(h) == dt else h + 1
+
+
+def revenue_range(env, start, end):
+    """
+    [start, end) 결제수단별 매출 합계 / 건수.
+    인덱스에 있는 정시 구간은 O(1), 앞뒤 자투리 시간과 인덱스 끝 이후는 tb_trade 에서 직접 합산한다.
+    """
+    start = start if isinstance(start, datetime) else datetime(start.year, start.month, start.day)
+    end = end if isinstance(end, datetime) else datetime(end.year, end.month, end.day)
+
+    totals = [0.0] * len(FIELDS)
+    live = [(start, end)]
+
+    idx = _open(env)
+    if idx is not None:
+        a, b = _ceil_hour_no(start), min(hour_no(end), idx.end)
+        if a < b:
+            lo, hi = idx.prefix(a), idx.prefix(b)
+            totals = [h - l for h, l in zip(hi, lo)]
+            live = [(start, from_hour_no(a)), (from_hour_no(b), end)]
+
+    for live_start, live_end in live:
+        if live_start >= live_end:
+            continue
+        for r in run_query(env, SQL_SALES_BY_METHOD, (live_start, live_end)):
+            method = "card" if r["is_card"] else "cash"
+            totals[FIELDS.index(method)] += float(r["total"] or 0)
+            totals[FIELDS.index(f"{method}_count")] += r["cnt"]
+
+    result = {name: _num(v) for name, v in zip(FIELDS, totals)}
+    result["total"] = _num(totals[0] + totals[1])
+    result["count"] = _num(totals[2] + totals[3])
+    return result
+
+
+def compare_ranges(env, current, previous):
+    """두 구간 합계와 증감률. current / previous = (start, end)"""
+    cur = revenue_range(env, *current)
+    prev = revenue_range(env, *previous)
+
+    diff = {}
+    for key in cur:
+        delta = cur[key] - prev[key]
+        percent = round(delta / prev[key] * 100, 1) if prev[key] else None
+        diff[key] = {"delta": _num(delta), "percent": percent}
+
+    return {"current": cur, "previous": prev, "diff": diff}
+
+
+# ---------------------------------------------------
+# 갱신 (rollup → 누적합 이어 붙이기)
+# ---------------------------------------------------
+def sync(env):
+    """
+    rollup watermark 까지 새 시간 slot 을 추가한다. 반환: 인덱스 끝 시각
+    최근 ROLLUP_RESYNC_DAYS 일의 slot 은 rollup 이 다시 집계했을 수 있으므로 잘라내고 다시 만든다.
+    """
+    wm = rollup_service.get_watermark(env, "trade")
+    if wm is None:
+        return None
+    target = hour_no(wm)
+
+    idx = _open(env)
+    if idx is not None:
+        base = idx.base
+        end = max(base, min(idx.end, target - rollup_service.ROLLUP_RESYNC_DAYS * 24))
+        cumulative = list(idx.prefix(end))
+        old = idx.raw_slots()[:(end - base + 1) * SLOT_SIZE]
+    else:
+        first = rollup_service.first_trade_bucket(env)
+        base = end = hour_no(first) if first else target
+        cumulative = [0.0] * len(FIELDS)
+        old = struct.pack(f"<{len(FIELDS)}d", *cumulative)
+
+    if end >= target:
+        return from_hour_no(end)
+
+    per_hour = {}
+    for r in rollup_service.trade_buckets(env, from_hour_no(end), from_hour_no(target)):
+        if SALE_STATUS.get(r["is_card"]) != r["status"]:
+            continue
+        sums = per_hour.setdefault(hour_no(r["bucket"]), [0.0] * len(FIELDS))
+        method = "card" if r["is_card"] else "cash"
+        sums[FIELDS.index(method)] += float(r["total"])
+        sums[FIELDS.index(f"{method}_count")] += r["cnt"]
+
+    new = bytearray()
+    for h in range(end, target):
+        for i, v in enumerate(per_hour.get(h, ())):
+            cumulative[i] += v
+        new += struct.pack(f"<{len(FIELDS)}d", *cumulative)
+
+    slots = (len(old) + len(new)) // SLOT_SIZE
+    os.makedirs(REVENUE_INDEX_DIR, exist_ok=True)
+    tmp = f"{_path(env)}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, base, slots).ljust(HEADER_SIZE, b"\0"))
+        f.write(old)
+        f.write(new)
+    os.replace(tmp, _path(env))
+
+    return from_hour_no(target)
+
+
+@rollup_service.add_sync_listener
+def _on_rollup_sync(env, source):
+    if source == "trade":
+        sync(env)
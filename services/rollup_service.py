@@ -0,0 +1,411 @@
+"""
+/services/rollup_service.py
+
+tb_trade / tb_user 시간 단위 집계(rollup) 저장소. (로컬 SQLite)
+
+"전체 기간" 시간대별 차트가 매번 테이블 전체를 스캔하지 않도록
+끝난 시간(hour)의 집계를 로컬에 쌓아두고, 아직 집계하지 않은 구간(live tail)만 DB 에서 읽는다.
+
+- trade_hourly : (env, 시각 버킷, 카드/현금, status) → 건수, 금액 합계
+- user_hourly  : (env, 시각 버킷) → 가입자 수
+- watermark    : env · 소스별로 "이 시각 이전은 집계 완료" 인 created_date 경계
+
+백그라운드 동기화는 watermark 이후의 끝난 시간만 GROUP BY 로 집계해 추가하고 watermark 를 올린다.
+lease 를 잡은 워커 하나만 동기화한다. (같은 서버의 여러 gunicorn 워커)
+최근 ROLLUP_RESYNC_DAYS 일은 매번 다시 집계해 덮어쓴다. (나중에 DEPOSIT_COMPLETED 가 되는 등 status 변경 반영)
+읽을 때는 watermark 이전 = rollup, 이후 = DB 직접 조회(현재 시간대 포함)를 합친다.
+
+    start_rollup_sync()                     # main.py 에서 1번
+    trade_rollup("prod", by="hour")         # 0~23시 × 카드/현금 × status
+    user_rollup("prod", start, end)         # 일자 × 시간대 가입자 수
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from config.admission import query_class_scope
+from config.db_config import run_query, use_replica
+from utils.local_store import LocalStore
+from utils.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_ENABLED = os.getenv("ROLLUP_ENABLED", "1") == "1"
+ROLLUP_DB_PATH = os.getenv("ROLLUP_DB_PATH", "data/rollup.sqlite3")
+ROLLUP_ENVS = tuple(e.strip() for e in os.getenv("ROLLUP_ENVS", "prod").split(",") if e.strip())
+ROLLUP_SYNC_INTERVAL = int(os.getenv("ROLLUP_SYNC_INTERVAL", "300"))
+# 시간이 끝나고 이만큼(초) 지난 뒤에 집계한다 (늦게 INSERT 되는 행 대비)
+ROLLUP_SYNC_LAG = int(os.getenv("ROLLUP_SYNC_LAG", "300"))
+# 매 동기화마다 다시 집계하는 최근 기간(일). 이보다 오래된 버킷은 더 이상 바뀌지 않는다고 본다
+ROLLUP_RESYNC_DAYS = int(os.getenv("ROLLUP_RESYNC_DAYS", "3"))
+# 처음 채울 때 한 번에 집계하는 기간(일)
+ROLLUP_CHUNK_DAYS = int(os.getenv("ROLLUP_CHUNK_DAYS", "30"))
+# watermark 가 이보다 오래되면(시간) rollup 을 쓰지 않고 기존 쿼리로 조회한다
+ROLLUP_MAX_LAG_HOURS = int(os.getenv("ROLLUP_MAX_LAG_HOURS", "24"))
+
+BUCKET_FORMAT = "%Y-%m-%d %H:00:00"
+
+
+# ---------------------------------------------------
+# SQL (MySQL, 시간 버킷 집계)
+# ---------------------------------------------------
+SQL_TRADE_BUCKETS = """
+    SELECT DATE_FORMAT(created_date, '%%Y-%%m-%%d %%H:00:00') AS bucket,
+           account_no IS NULL AS is_card,
+           status,
+           COUNT(*) AS cnt,
+           SUM(amount) AS total
+    FROM tb_trade
+    WHERE created_date >= %s
+      AND created_date < %s
+    GROUP BY bucket, is_card, status
+"""
+
+SQL_USER_BUCKETS = """
+    SELECT DATE_FORMAT(created_date, '%%Y-%%m-%%d %%H:00:00') AS bucket,
+           COUNT(*) AS cnt
+    FROM tb_user
+    WHERE created_date >= %s
+      AND created_date < %s
+    GROUP BY bucket
+"""
+
+SQL_MIN_CREATED = {
+    "trade": "SELECT MIN(created_date) AS first FROM tb_trade",
+    "user": "SELECT MIN(created_date) AS first FROM tb_user",
+}
+
+
+# ---------------------------------------------------
+# SQLite 저장소
+# ---------------------------------------------------
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS trade_hourly (
+        env     TEXT    NOT NULL,
+        bucket  TEXT    NOT NULL,
+        is_card INTEGER NOT NULL,
+        status  TEXT    NOT NULL,
+        cnt     INTEGER NOT NULL,
+        total   NUMERIC NOT NULL,
+        PRIMARY KEY (env, bucket, is_card, status)
+    );
+    CREATE TABLE IF NOT EXISTS user_hourly (
+        env    TEXT    NOT NULL,
+        bucket TEXT    NOT NULL,
+        cnt    INTEGER NOT NULL,
+        PRIMARY KEY (env, bucket)
+    );
+    CREATE TABLE IF NOT EXISTS watermark (
+        env          TEXT NOT NULL,
+        source       TEXT NOT NULL,
+        created_date TEXT NOT NULL,
+        synced_at    TEXT NOT NULL,
+        PRIMARY KEY (env, source)
+    );
+"""
+
+_db = LocalStore(ROLLUP_DB_PATH, _SCHEMA)
+
+def floor_hour(dt):
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _as_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+
+
+def get_watermark(env, source):
+    """source("trade" / "user") 의 집계 완료 경계. 아직 없으면 None."""
+    with closing(_db.connect()) as conn:
+        row = conn.execute(
+            "SELECT created_date FROM watermark WHERE env=? AND source=?", (env, source)
+        ).fetchone()
+    return _as_datetime(row["created_date"]) if row else None
+
+
+def is_ready(env, source):
+    """rollup 으로 읽어도 되는지. (동기화가 한 번 이상 끝났고 너무 밀려 있지 않을 때)"""
+    if not ROLLUP_ENABLED:
+        return False
+    try:
+        wm = get_watermark(env, source)
+    except sqlite3.Error:
+        logger.exception("rollup 저장소 조회 실패")
+        return False
+    return wm is not None and datetime.now() - wm < timedelta(hours=ROLLUP_MAX_LAG_HOURS)
+
+
+# ---------------------------------------------------
+# 동기화 (watermark 이후 끝난 시간만 집계)
+# ---------------------------------------------------
+def _store_trade(conn, env, rows):
+    conn.executemany(
+        "INSERT OR REPLACE INTO trade_hourly (env, bucket, is_card, status, cnt, total)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        [(env, r["bucket"], r["is_card"], r["status"] or "", r["cnt"], str(r["total"] or 0)) for r in rows],
+    )
+
+
+def _store_user(conn, env, rows):
+    conn.executemany(
+        "INSERT OR REPLACE INTO user_hourly (env, bucket, cnt) VALUES (?, ?, ?)",
+        [(env, r["bucket"], r["cnt"]) for r in rows],
+    )
+
+
+_SOURCES = {
+    "trade": (SQL_TRADE_BUCKETS, _store_trade, "trade_hourly"),
+    "user": (SQL_USER_BUCKETS, _store_user, "user_hourly"),
+}
+
+
+def _clear(conn, env, table, start, end):
+    conn.execute(
+        f"DELETE FROM {table} WHERE env=? AND bucket >= ? AND bucket < ?",
+        (env, start.strftime(BUCKET_FORMAT), end.strftime(BUCKET_FORMAT)),
+    )
+
+
+def _set_watermark(conn, env, source, wm):
+    conn.execute(
+        "INSERT OR REPLACE INTO watermark (env, source, created_date, synced_at) VALUES (?, ?, ?, ?)",
+        (env, source, wm.strftime("%Y-%m-%d %H:%M:%S"), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+    )
+
+
+def sync(env, source, renew=None):
+    """
+    watermark ~ (지금 - ROLLUP_SYNC_LAG) 의 끝난 시간들을 집계해 저장하고 watermark 를 올린다.
+    구간별로 버킷 저장과 watermark 갱신을 한 트랜잭션으로 처리한다.
+    그 다음 최근 ROLLUP_RESYNC_DAYS 일을 다시 집계해 통째로 바꾼다.
+    renew() 는 구간마다 호출해 lease 를 연장한다. False 면 (lease 를 잃음) 여기서 멈춘다.
+    반환: 새 watermark
+    """
+    sql, store, table = _SOURCES[source]
+    cutoff = floor_hour(datetime.now() - timedelta(seconds=ROLLUP_SYNC_LAG))
+
+    with use_replica(True), query_class_scope("background"):
+        wm = get_watermark(env, source)
+
+        if wm is None:
+            first = run_query(env, SQL_MIN_CREATED[source])[0]["first"]
+            if first is None:
+                # 빈 테이블: 지금부터 집계
+                with closing(_db.connect()) as conn, conn:
+                    _set_watermark(conn, env, source, cutoff)
+                return cutoff
+            wm = floor_hour(first)
+
+        while wm < cutoff:
+            if renew is not None and not renew():
+                return wm
+            chunk_end = min(wm + timedelta(days=ROLLUP_CHUNK_DAYS), cutoff)
+            rows = run_query(env, sql, (wm, chunk_end))
+
+            with closing(_db.connect()) as conn, conn:
+                store(conn, env, rows)
+                _set_watermark(conn, env, source, chunk_end)
+            wm = chunk_end
+
+        if ROLLUP_RESYNC_DAYS > 0:
+            resync_start = floor_hour(wm - timedelta(days=ROLLUP_RESYNC_DAYS))
+            rows = run_query(env, sql, (resync_start, wm))
+            with closing(_db.connect()) as conn, conn:
+                _clear(conn, env, table, resync_start, wm)
+                store(conn, env, rows)
+
+    return wm
+
+
+_sync_listeners = []
+
+
+def add_sync_listener(func):
+    """동기화가 끝날 때마다 func(env, source) 를 호출한다. (rollup 을 원본으로 쓰는 인덱스 갱신용)"""
+    _sync_listeners.append(func)
+    return func
+
+
+def sync_all(renew=None):
+    for env in ROLLUP_ENVS:
+        for source in _SOURCES:
+            if renew is not None and not renew():
+                return
+            try:
+                sync(env, source, renew)
+            except Exception:
+                logger.exception("rollup 동기화 실패 (%s/%s)", env, source)
+                continue
+            for listener in _sync_listeners:
+                try:
+                    listener(env, source)
+                except Exception:
+                    logger.exception("rollup 동기화 후처리 실패 (%s/%s)", env, source)
+
+
+def _hold_lease():
+    # lease 는 주기의 3배 → lease 를 잡은 워커가 죽으면 다른 워커가 이어받는다
+    return _db.acquire_lease("rollup-sync", ROLLUP_SYNC_INTERVAL * 3)
+
+
+def _sync_loop():
+    while True:
+        try:
+            if _hold_lease():
+                sync_all(renew=_hold_lease)
+        except Exception:
+            logger.exception("rollup 동기화 오류")
+        time.sleep(ROLLUP_SYNC_INTERVAL)
+
+
+def start_rollup_sync():
+    """백그라운드 동기화 스레드를 시작한다. (ROLLUP_ENABLED=0 이면 시작하지 않음)"""
+    if not ROLLUP_ENABLED:
+        return None
+    thread = threading.Thread(target=_sync_loop, name="rollup-sync", daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------------------------------------------------
+# 조회 (rollup + live tail)
+# ---------------------------------------------------
+_KEY_SQL = {
+    "hour": "CAST(substr(bucket, 12, 2) AS INTEGER)",
+    "day": "substr(bucket, 1, 10)",
+}
+
+
+def _key_of(bucket, by):
+    # bucket("YYYY-MM-DD HH:00:00") → 집계 키 (0~23 또는 date)
+    if by == "hour":
+        return int(bucket[11:13])
+    return date.fromisoformat(bucket[:10])
+
+
+def _window(env, source, start, end):
+    # [start, end) → rollup 구간 [start, min(end, wm)) + live 구간 [max(start, wm), end)
+    start = _as_datetime(start) if start else datetime.min
+    end = _as_datetime(end) if end else floor_hour(datetime.now()) + timedelta(hours=1)
+    wm = get_watermark(env, source) or start
+    return start, min(end, wm), max(start, wm), end
+
+
+def trade_rollup(env, start=None, end=None, by="hour"):
+    """
+    tb_trade 집계. by = "hour"(0~23시) / "day"(일자). start 가 None 이면 전체 기간.
+    반환: [{"key", "is_card", "status", "cnt", "total"}, ...]
+    """
+    start, rolled_end, tail_start, end = _window(env, "trade", start, end)
+    totals = {}
+
+    def add(key, is_card, status, cnt, total):
+        k = (key, is_card, status)
+        c, t = totals.get(k, (0, 0))
+        totals[k] = (c + cnt, t + total)
+
+    key_sql = _KEY_SQL[by]
+    with closing(_db.connect()) as conn:
+        rows = conn.execute(
+            f"SELECT {key_sql} AS key, is_card, status, SUM(cnt) AS cnt, SUM(total) AS total"
+            " FROM trade_hourly WHERE env=? AND bucket >= ? AND bucket < ?"
+            f" GROUP BY {key_sql}, is_card, status",
+            (env, start.strftime(BUCKET_FORMAT), rolled_end.strftime(BUCKET_FORMAT)),
+        ).fetchall()
+
+    for r in rows:
+        key = date.fromisoformat(r["key"]) if by == "day" else r["key"]
+        add(key, r["is_card"], r["status"], r["cnt"], Decimal(str(r["total"])))
+
+    if tail_start < end:
+        for r in run_query(env, SQL_TRADE_BUCKETS, (tail_start, end)):
+            add(_key_of(r["bucket"], by), r["is_card"], r["status"] or "", r["cnt"], r["total"] or 0)
+
+    return [
+        {"key": key, "is_card": is_card, "status": status, "cnt": cnt, "total": total}
+        for (key, is_card, status), (cnt, total) in totals.items()
+    ]
+
+
+def trade_buckets(env, start, end):
+    """
+    저장된 tb_trade 시간 버킷을 시각 순으로 반환한다. (live tail 없음, [start, end))
+    반환: [{"bucket": datetime, "is_card", "status", "cnt", "total"}, ...]
+    """
+    with closing(_db.connect()) as conn:
+        rows = conn.execute(
+            "SELECT bucket, is_card, status, cnt, total FROM trade_hourly"
+            " WHERE env=? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+            (env, _as_datetime(start).strftime(BUCKET_FORMAT), _as_datetime(end).strftime(BUCKET_FORMAT)),
+        ).fetchall()
+    return [
+        {"bucket": _as_datetime(r["bucket"]), "is_card": r["is_card"], "status": r["status"],
+         "cnt": r["cnt"], "total": r["total"]}
+        for r in rows
+    ]
+
+
+def first_trade_bucket(env):
+    """저장된 가장 이른 tb_trade 버킷 시각. 없으면 None."""
+    with closing(_db.connect()) as conn:
+        row = conn.execute("SELECT MIN(bucket) AS first FROM trade_hourly WHERE env=?", (env,)).fetchone()
+    return _as_datetime(row["first"]) if row["first"] else None
+
+
+def user_rollup(env, start, end):
+    """
+    tb_user 일자 × 시간대 가입자 수. (SQL_USER_DAY_HOUR 와 같은 모양)
+    반환: [{"day", "hr", "cnt"}, ...]
+    """
+    start, rolled_end, tail_start, end = _window(env, "user", start, end)
+    counts = {}
+
+    with closing(_db.connect()) as conn:
+        rows = conn.execute(
+            "SELECT bucket, cnt FROM user_hourly WHERE env=? AND bucket >= ? AND bucket < ?",
+            (env, start.strftime(BUCKET_FORMAT), rolled_end.strftime(BUCKET_FORMAT)),
+        ).fetchall()
+
+    for r in rows:
+        counts[r["bucket"]] = counts.get(r["bucket"], 0) + r["cnt"]
+
+    if tail_start < end:
+        for r in run_query(env, SQL_USER_BUCKETS, (tail_start, end)):
+            counts[r["bucket"]] = counts.get(r["bucket"], 0) + r["cnt"]
+
+    return [
+        {"day": date.fromisoformat(bucket[:10]), "hr": int(bucket[11:13]), "cnt": cnt}
+        for bucket, cnt in counts.items()
+    ]
+
+
+# ---------------------------------------------------
+# /metrics
+# ---------------------------------------------------
+@register_collector
+def _collect_rollup():
+    if not ROLLUP_ENABLED:
+        return []
+    samples = []
+    now = datetime.now()
+    try:
+        for env in ROLLUP_ENVS:
+            for source in _SOURCES:
+                wm = get_watermark(env, source)
+                if wm is not None:
+                    samples.append(({"env": env, "source": source}, (now - wm).total_seconds()))
+    except sqlite3.Error:
+        pass
+    return [
+        ("app_rollup_watermark_age_seconds", "gauge", "rollup 집계 완료 경계가 지금보다 늦은 시간", samples),
+    ]
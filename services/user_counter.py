@@ -0,0 +1,219 @@
+"""
+/services/user_counter.py
+
+총 가입자 수 카운터. (SELECT COUNT(*) FROM tb_user 전체 스캔 대신)
+
+    총 가입자 수 = baseline(watermark 이전 가입자 수) + watermark 이후 가입자 수(최근 구간 COUNT)
+
+- 처음 / 주기적 재조정(reconcile): watermark 이전 전체 COUNT 로 baseline 을 새로 잡는다
+  (탈퇴 · 삭제로 생기는 차이를 바로잡음, created_date 가 NULL 인 행도 baseline 에 포함)
+  전체 스캔이라 lease 를 잡은 워커 하나만 실행한다.
+- 평소(advance)        : watermark ~ 지금 사이 가입자 수만 세서 baseline 에 더하고 watermark 를 올린다
+- 조회                 : baseline + (watermark 이후 COUNT) → created_date 인덱스로 최근 행만 읽는다
+
+상태는 로컬 SQLite (USER_COUNTER_PATH) 에 저장해 워커끼리 공유한다.
+advance 는 "watermark 가 그대로일 때만" 갱신하므로 여러 워커가 동시에 돌려도 두 번 더해지지 않는다.
+
+    start_user_counter()     # main.py 에서 1번
+    total_users("prod")      # 준비 전이면 None
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+
+from config.admission import query_class_scope
+from config.db_config import run_query, use_replica
+from utils.local_store import LocalStore
+from utils.metrics import Gauge, register_collector
+
+logger = logging.getLogger(__name__)
+
+USER_COUNTER_ENABLED = os.getenv("USER_COUNTER_ENABLED", "1") == "1"
+USER_COUNTER_PATH = os.getenv("USER_COUNTER_PATH", "data/user_counter.sqlite3")
+USER_COUNTER_ENVS = tuple(e.strip() for e in os.getenv("USER_COUNTER_ENVS", "prod").split(",") if e.strip())
+USER_COUNTER_INTERVAL = int(os.getenv("USER_COUNTER_INTERVAL", "60"))
+USER_COUNTER_RECONCILE = int(os.getenv("USER_COUNTER_RECONCILE", str(6 * 3600)))
+# 지금보다 이만큼(초) 이전까지만 baseline 에 넣는다 (늦게 INSERT 되는 행 대비)
+USER_COUNTER_LAG = int(os.getenv("USER_COUNTER_LAG", "300"))
+# 재조정(전체 COUNT) lease 유지 시간(초). 이 안에 다른 워커는 재조정하지 않는다
+USER_COUNTER_LEASE = int(os.getenv("USER_COUNTER_LEASE", "900"))
+
+USER_COUNTER_DRIFT = Gauge(
+    "app_user_counter_drift", "마지막 재조정 때 카운터와 실제 COUNT(*) 의 차이", ["env"]
+)
+
+
+# ---------------------------------------------------
+# SQL
+# ---------------------------------------------------
+# created_date 가 NULL 인 행도 전체 COUNT(*) 에 들어가므로 baseline 에 포함한다
+SQL_USER_COUNT_BEFORE = "SELECT COUNT(*) AS cnt FROM tb_user WHERE created_date < %s OR created_date IS NULL"
+
+SQL_USER_COUNT_SINCE = "SELECT COUNT(*) AS cnt FROM tb_user WHERE created_date >= %s"
+
+SQL_USER_COUNT_BETWEEN = """
+    SELECT COUNT(*) AS cnt
+    FROM tb_user
+    WHERE created_date >= %s
+      AND created_date < %s
+"""
+
+
+# ---------------------------------------------------
+# SQLite 상태
+# ---------------------------------------------------
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS user_counter (
+        env           TEXT PRIMARY KEY,
+        baseline      INTEGER NOT NULL,
+        watermark     TEXT    NOT NULL,
+        reconciled_at REAL    NOT NULL
+    );
+"""
+
+_db = LocalStore(USER_COUNTER_PATH, _SCHEMA)
+
+def _fmt(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def get_state(env):
+    """{"baseline", "watermark", "reconciled_at"} 또는 None"""
+    with closing(_db.connect()) as conn:
+        row = conn.execute(
+            "SELECT baseline, watermark, reconciled_at FROM user_counter WHERE env=?", (env,)
+        ).fetchone()
+    if row is None:
+        return None
+    return {
+        "baseline": row["baseline"],
+        "watermark": datetime.strptime(row["watermark"], "%Y-%m-%d %H:%M:%S"),
+        "reconciled_at": row["reconciled_at"],
+    }
+
+
+# ---------------------------------------------------
+# 갱신
+# ---------------------------------------------------
+def _cutoff():
+    return (datetime.now() - timedelta(seconds=USER_COUNTER_LAG)).replace(microsecond=0)
+
+
+def reconcile(env):
+    """watermark 이전 가입자 수를 정확히 다시 센다. 반환: (baseline, 이전 카운터와의 차이)"""
+    cutoff = _cutoff()
+    state = get_state(env)
+
+    with use_replica(True), query_class_scope("background"):
+        exact = run_query(env, SQL_USER_COUNT_BEFORE, (cutoff,))[0]["cnt"]
+        drift = None
+        if state is not None:
+            counted = state["baseline"]
+            if state["watermark"] < cutoff:
+                counted += run_query(env, SQL_USER_COUNT_BETWEEN, (state["watermark"], cutoff))[0]["cnt"]
+            drift = exact - counted
+
+    with closing(_db.connect()) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO user_counter (env, baseline, watermark, reconciled_at) VALUES (?, ?, ?, ?)",
+            (env, exact, _fmt(cutoff), time.time()),
+        )
+
+    if drift is not None:
+        USER_COUNTER_DRIFT.set(drift, env=env)
+        if drift:
+            logger.info("총 가입자 카운터 재조정 (%s): 차이 %+d", env, drift)
+    return exact, drift
+
+
+def advance(env):
+    """watermark 이후 가입자 수를 baseline 에 더한다. (다른 워커가 먼저 했으면 아무것도 안 함)"""
+    state = get_state(env)
+    if state is None:
+        return False
+
+    cutoff = _cutoff()
+    if state["watermark"] >= cutoff:
+        return False
+
+    with use_replica(True), query_class_scope("dashboard"):
+        delta = run_query(env, SQL_USER_COUNT_BETWEEN, (state["watermark"], cutoff))[0]["cnt"]
+
+    with closing(_db.connect()) as conn, conn:
+        updated = conn.execute(
+            "UPDATE user_counter SET baseline = baseline + ?, watermark = ?"
+            " WHERE env=? AND watermark=?",
+            (delta, _fmt(cutoff), env, _fmt(state["watermark"])),
+        ).rowcount
+    return bool(updated)
+
+
+def tick(env):
+    state = get_state(env)
+    if state is None or time.time() - state["reconciled_at"] > USER_COUNTER_RECONCILE:
+        # 전체 COUNT 는 워커 하나만. 나머지는 이번 주기에 advance 만 한다
+        if _db.acquire_lease(f"reconcile:{env}", USER_COUNTER_LEASE):
+            reconcile(env)
+            return
+    advance(env)
+
+
+def _counter_loop():
+    while True:
+        for env in USER_COUNTER_ENVS:
+            try:
+                tick(env)
+            except Exception:
+                logger.exception("총 가입자 카운터 갱신 실패 (%s)", env)
+        time.sleep(USER_COUNTER_INTERVAL)
+
+
+def start_user_counter():
+    """백그라운드 갱신 스레드를 시작한다. (USER_COUNTER_ENABLED=0 이면 시작하지 않음)"""
+    if not USER_COUNTER_ENABLED:
+        return None
+    thread = threading.Thread(target=_counter_loop, name="user-counter", daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------------------------------------------------
+# 조회
+# ---------------------------------------------------
+def total_users(env):
+    """baseline + watermark 이후 가입자 수. 카운터가 아직 없으면 None."""
+    if not USER_COUNTER_ENABLED:
+        return None
+    try:
+        state = get_state(env)
+    except sqlite3.Error:
+        logger.exception("총 가입자 카운터 조회 실패")
+        return None
+    if state is None:
+        return None
+
+    recent = run_query(env, SQL_USER_COUNT_SINCE, (state["watermark"],))[0]["cnt"]
+    return state["baseline"] + recent
+
+
+@register_collector
+def _collect_counter():
+    if not USER_COUNTER_ENABLED:
+        return []
+    samples = []
+    now = time.time()
+    try:
+        for env in USER_COUNTER_ENVS:
+            state = get_state(env)
+            if state is not None:
+                samples.append(({"env": env}, now - state["reconciled_at"]))
+    except sqlite3.Error:
+        pass
+    return [
+        ("app_user_counter_reconcile_age_seconds", "gauge", "총 가입자 카운터 마지막 재조정 후 지난 시간", samples),
+    ]
@@ -1,100 +1,154 @@
 # services/user_service.py
 from datetime import datetime, timedelta
-from config.db_config import run_query
+from config.admission import query_class
+from config.db_config import run_query, read_replica
+from services import rollup_service, user_counter
+from utils.cache import ttl_cache
+from utils.day_cache import get_days
+
+
+# 기간 내 가입자 수
+SQL_USER_COUNT_RANGE = """
+    SELECT COUNT(*) AS cnt
+    FROM tb_user
+    WHERE created_date >= %s
+      AND created_date < %s
+"""
+
+# 일자 × 시간대별 가입자 수 (기간, 스캔 1번 → 일별 / 시간대별 모두 계산)
+SQL_USER_DAY_HOUR = """
+    SELECT DATE(created_date) AS day, HOUR(created_date) AS hr, COUNT(*) AS cnt
+    FROM tb_user
+    WHERE created_date >= %s
+      AND created_date < %s
+    GROUP BY DATE(created_date), HOUR(created_date)
+"""
+
+# 총 가입자 수
+SQL_USER_TOTAL = "SELECT COUNT(*) AS cnt FROM tb_user"
+
+
+# 가입자 분석 화면에서 고를 수 있는 기간(일)
+USER_WINDOWS = (7, 30, 90, 365)
+DEFAULT_USER_WINDOW = 30
+
+
+def last_n_days(n):
+    # 오늘 포함 최근 n일 (day, next_day) 목록
+    today = datetime.now().date()
+    days = [today - timedelta(days=n - 1 - i) for i in range(n)]
+    return [(day, day + timedelta(days=1)) for day in days]
+
+
+def fetch_user_day_hours(env, start, end):
+    """[start, end) 일자별 0~23시 가입자 수 {date: [24개]} (rollup 이 준비돼 있으면 rollup 사용)"""
+    if rollup_service.is_ready(env, "user"):
+        rows = rollup_service.user_rollup(env, start, end)
+    else:
+        rows = run_query(env, SQL_USER_DAY_HOUR, (start, end))
+
+    result = {}
+    for r in rows:
+        result.setdefault(r["day"], [0] * 24)[r["hr"]] += r["cnt"]
+    return result
+
+
+def build_user_analytics(rows, days):
+    """
+    SQL_USER_DAY_HOUR 결과 → 일별 / 시간대별 가입자 수.
+    가입자가 없는 날짜 / 시간대는 0 으로 채운다.
+    """
+    per_day = {}
+    per_hour = [0] * 24
+
+    for r in rows:
+        per_day[r["day"]] = per_day.get(r["day"], 0) + r["cnt"]
+        per_hour[r["hr"]] += r["cnt"]
+
+    return {
+        "days": len(days),
+        "daily": [
+            {"date": day.strftime("%m/%d"), "count": per_day.get(day, 0)}
+            for day, _ in days
+        ],
+        "hourly": [{"hour": h, "count": per_hour[h]} for h in range(24)],
+    }
 
 
 # -----------------------------------------------------
 # 오늘 가입자 수
 # -----------------------------------------------------
+@ttl_cache(ttl=60, max_stale=240, daily=True)
+@read_replica
+@query_class("dashboard")
 def get_today_users(env="prod"):
     today = datetime.now().date()
     tomorrow = today + timedelta(days=1)
 
-    sql = """
-        SELECT COUNT(*) AS cnt
-        FROM tb_user
-        WHERE created_date >= %s
-          AND created_date < %s
-    """
-
-    rows = run_query(env, sql, (today, tomorrow))
+    rows = run_query(env, SQL_USER_COUNT_RANGE, (today, tomorrow))
     return rows[0]["cnt"] or 0
 
 
 # -----------------------------------------------------
 # 어제 가입자 수
 # -----------------------------------------------------
+@ttl_cache(ttl=600, max_stale=1800, daily=True)
+@read_replica
+@query_class("dashboard")
 def get_yesterday_users(env="prod"):
     today = datetime.now().date()
     yesterday = today - timedelta(days=1)
 
-    sql = """
-        SELECT COUNT(*) AS cnt
-        FROM tb_user
-        WHERE created_date >= %s
-          AND created_date < %s
-    """
-
-    rows = run_query(env, sql, (yesterday, today))
+    rows = run_query(env, SQL_USER_COUNT_RANGE, (yesterday, today))
     return rows[0]["cnt"] or 0
 
 
 # -----------------------------------------------------
-# 최근 30일 가입자 수 (일자별)
+# 최근 n일 가입자 분석 (일자별 + 시간대별, 쿼리 최대 1번)
 # -----------------------------------------------------
-def get_monthly_users(env="prod"):
-    today = datetime.now().date()
-    result = []
-
-    for i in range(30):
-        day = today - timedelta(days=29 - i)
-        next_day = day + timedelta(days=1)
+@ttl_cache(ttl=300, max_stale=900, daily=True)
+@read_replica
+@query_class("dashboard")
+def get_user_analytics(env="prod", days=DEFAULT_USER_WINDOW):
+    if days not in USER_WINDOWS:
+        raise ValueError(f"지원하지 않는 기간입니다: {days} (가능: {USER_WINDOWS})")
 
-        sql = """
-            SELECT COUNT(*) AS cnt
-            FROM tb_user
-            WHERE created_date >= %s
-              AND created_date < %s
-        """
+    window = last_n_days(days)
 
-        rows = run_query(env, sql, (day, next_day))
-        count = rows[0]["cnt"] or 0
+    # 지난 날짜는 일자별 캐시(0~23시 가입자 수), 오늘 + 정정 구간만 조회
+    rows = [
+        {"day": day, "hr": hr, "cnt": cnt}
+        for day, hours in get_days("user_day_hours", env, [day for day, _ in window],
+                                   fetch_user_day_hours, empty=lambda: [0] * 24,
+                                   correction_days=rollup_service.ROLLUP_RESYNC_DAYS)
+        for hr, cnt in enumerate(hours) if cnt
+    ]
 
-        result.append({
-            "date": day.strftime("%m/%d"),
-            "count": count
-        })
-
-    return result
+    return build_user_analytics(rows, window)
 
 
 # -----------------------------------------------------
-# 🔥 시간대별 가입자 수 (0~23시 전체 기간 기준)
+# 최근 30일 가입자 수 (일자별)
 # -----------------------------------------------------
-def get_hourly_users(env="prod"):
-    sql = """
-        SELECT HOUR(created_date) AS hr, COUNT(*) AS cnt
-        FROM tb_user
-        GROUP BY HOUR(created_date)
-        ORDER BY hr;
-    """
-
-    rows = run_query(env, sql)
-
-    # 0~23시 빠진 시간대 보정
-    result = []
-    hours = {r["hr"]: r["cnt"] for r in rows}
+def get_monthly_users(env="prod"):
+    return get_user_analytics(env, 30)["daily"]
 
-    for h in range(24):
-        result.append({
-            "hour": h,
-            "count": hours.get(h, 0)
-        })
 
-    return result
+# -----------------------------------------------------
+# 🔥 시간대별 가입자 수 (0~23시, 최근 n일 기준)
+# -----------------------------------------------------
+def get_hourly_users(env="prod", days=DEFAULT_USER_WINDOW):
+    return get_user_analytics(env, days)["hourly"]
 
 
+@ttl_cache(ttl=60, max_stale=240)
+@read_replica
+@query_class("dashboard")
 def get_total_users(env="prod"):
-    sql = "SELECT COUNT(*) AS cnt FROM tb_user"
-    rows = run_query(env, sql)
+    # 유지 중인 카운터(baseline + 최근 가입자) → 없으면 전체 COUNT(*)
+    total = user_counter.total_users(env)
+    if total is not None:
+        return total
+
+    rows = run_query(env, SQL_USER_TOTAL)
     return rows[0]["cnt"] or 0
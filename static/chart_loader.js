@@ -0,0 +1,22 @@
+/* ===============================
+   차트 데이터 비동기 로딩
+   - 화면을 먼저 그리고, 차트마다 JSON API 를 병렬로 불러온다
+   - 브라우저 캐시 + ETag 로 바뀌지 않은 데이터는 304 로 끝난다
+   =============================== */
+function loadChart(canvasId, url, build) {
+    const canvas = document.getElementById(canvasId);
+    const status = document.getElementById(canvasId + "Status");
+
+    return fetch(url, { headers: { "Accept": "application/json" } })
+        .then(res => {
+            if (!res.ok) throw new Error(res.status + " " + res.statusText);
+            return res.json();
+        })
+        .then(data => {
+            if (status) status.remove();
+            return new Chart(canvas, build(data));
+        })
+        .catch(err => {
+            if (status) status.textContent = "데이터를 불러오지 못했습니다 (" + err.message + ")";
+        });
+}
@@ -0,0 +1,20 @@
+/* ===============================
+   ?format=columnar 응답 → 행 객체 배열
+   (utils/columnar.py 의 to_columnar 역변환)
+   =============================== */
+function fromColumnar(table) {
+    if (!table) return [];
+    if (Array.isArray(table)) return table;
+
+    const columns = table.columns;
+    const dicts = columns.map(c => (table.dicts || {})[c]);
+
+    return table.rows.map(row => {
+        const obj = {};
+        columns.forEach((c, i) => {
+            const v = row[i];
+            obj[c] = (dicts[i] && v !== null) ? dicts[i][v] : v;
+        });
+        return obj;
+    });
+}
@@ -0,0 +1,279 @@
+"""
+/utils/cache.py
+
+서비스 함수 결과를 메모리에 잠시 보관하는 TTL 캐시.
+
+    @ttl_cache(ttl=60)
+    def get_total_users(env="prod"):
+        ...
+
+- 키      : 함수 이름 + 인자(env 포함)
+- 만료    : 함수마다 지정한 ttl(초)
+- stale   : ttl 이 지나도 max_stale(초) 동안은 이전 값을 바로 돌려주고, 백그라운드에서 1번만 다시 계산한다
+- 합치기  : 같은 키를 동시에 계산하려는 호출은 하나만 실행하고 나머지는 그 결과를 기다린다 (single-flight)
+- 용량    : 항목 수 / 대략적인 바이트 수 한도를 넘으면 가장 오래 안 쓴 것부터 제거(LRU)
+- 무효화  : func.invalidate(*args) / invalidate(이름) / invalidate()
+- 통계    : cache_stats() → 함수별 hit / stale hit / miss / 합쳐진 호출 횟수
+
+    @ttl_cache(ttl=60, max_stale=300)   # 1분 fresh, 이후 5분까지는 이전 값 + 백그라운드 갱신
+    @ttl_cache(ttl=60, max_stale=300, daily=True)   # "오늘" 기준 값: 자정을 넘겨 fresh / stale 로 남지 않는다
+"""
+
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# 다른 호출의 계산 결과를 기다리는 최대 시간(초). 넘기면 직접 계산한다
+CACHE_FLIGHT_TIMEOUT = float(os.getenv("CACHE_FLIGHT_TIMEOUT", "30"))
+CACHE_REFRESH_WORKERS = int(os.getenv("CACHE_REFRESH_WORKERS", "4"))
+
+FRESH, STALE, MISS = "fresh", "stale", "miss"
+
+
+def _estimate_size(value):
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class ResultCache:
+    """스레드 안전한 TTL + LRU 캐시."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key → (value, expires_at, stale_until, size)
+        self._bytes = 0
+        self._stats = {}                # 함수 이름 → {"hits", "stale_hits", "misses", "coalesced", "evictions"}
+
+    def _counter(self, name):
+        return self._stats.setdefault(
+            name, {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+        )
+
+    def count(self, name, field):
+        with self._lock:
+            self._counter(name)[field] += 1
+
+    def get(self, key):
+        """
+        (상태, 값) 을 반환한다. 상태: FRESH / STALE(만료됐지만 max_stale 안) / MISS.
+        stale 기간까지 지난 항목은 지운다.
+        """
+        name = key[0]
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self._counter(name)["hits"] += 1
+                return FRESH, entry[0]
+
+            if entry is not None and entry[2] > now:
+                self._entries.move_to_end(key)
+                self._counter(name)["stale_hits"] += 1
+                return STALE, entry[0]
+
+            if entry is not None:
+                self._remove(key)
+            self._counter(name)["misses"] += 1
+            return MISS, None
+
+    def set(self, key, value, ttl, max_stale=0):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            expires_at = time.monotonic() + ttl
+            self._entries[key] = (value, expires_at, expires_at + max_stale, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                old_key = next(iter(self._entries))
+                self._remove(old_key)
+                self._counter(old_key[0])["evictions"] += 1
+
+    def _remove(self, key):
+        size = self._entries.pop(key)[-1]
+        self._bytes -= size
+
+    def invalidate(self, name=None, key=None):
+        """key 가 있으면 그 항목만, name 만 있으면 해당 함수 전체, 둘 다 없으면 전체를 지운다."""
+        with self._lock:
+            if key is not None:
+                if key in self._entries:
+                    self._remove(key)
+                return
+
+            for k in list(self._entries):
+                if name is None or k[0] == name:
+                    self._remove(k)
+
+    def stats(self):
+        with self._lock:
+            functions = {}
+            for name, counter in self._stats.items():
+                served = counter["hits"] + counter["stale_hits"]
+                total = served + counter["misses"]
+                functions[name] = dict(counter, hit_ratio=served / total if total else 0.0)
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "functions": functions,
+            }
+
+
+_cache = ResultCache()
+
+
+def _make_key(name, signature, args, kwargs):
+    # f(), f("prod"), f(env="prod") 가 같은 키가 되도록 기본값까지 채워서 만든다
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return (name, tuple(bound.arguments.items()))
+
+
+# ---------------------------------------------------
+# single-flight: 키마다 계산 중인 호출 하나
+# ---------------------------------------------------
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+_refresher = ThreadPoolExecutor(max_workers=CACHE_REFRESH_WORKERS, thread_name_prefix="cache-refresh")
+
+
+def _join_flight(key):
+    """(flight, 내가 계산할 차례인지)"""
+    with _flights_lock:
+        flight = _flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _flights[key] = _Flight()
+        return flight, True
+
+
+def _seconds_to_midnight():
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (midnight - now).total_seconds()
+
+
+def _bounded(ttl, max_stale, daily):
+    """daily 면 fresh / stale 기간을 다음 자정까지로 자른다."""
+    if not daily:
+        return ttl, max_stale
+    left = _seconds_to_midnight()
+    ttl = min(ttl, left)
+    return ttl, max(0, min(max_stale, left - ttl))
+
+
+def _fill(key, flight, func, args, kwargs, ttl, max_stale, daily=False):
+    """계산해서 캐시에 넣고, 기다리는 호출들에게 결과를 넘긴다."""
+    try:
+        value = func(*args, **kwargs)
+        _cache.set(key, value, *_bounded(ttl, max_stale, daily))
+        flight.value = value
+        return value
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.event.set()
+
+
+def _refresh_in_background(key, flight, func, args, kwargs, ttl, max_stale, daily):
+    try:
+        _fill(key, flight, func, args, kwargs, ttl, max_stale, daily)
+    except Exception:
+        logger.exception("캐시 백그라운드 갱신 실패 (%s) → 이전 값 유지", key[0])
+
+
+def ttl_cache(ttl, max_stale=0, daily=False):
+    """
+    함수 결과를 ttl 초 동안 캐시하는 데코레이터.
+    max_stale 초 동안은 만료된 값을 바로 돌려주고 백그라운드에서 다시 계산한다.
+    daily=True: 오늘 날짜로 계산하는 함수 → 캐시가 다음 자정을 넘지 않는다.
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _make_key(name, signature, args, kwargs)
+            status, value = _cache.get(key)
+            if status == FRESH:
+                return value
+
+            flight, leader = _join_flight(key)
+
+            if status == STALE:
+                if leader:
+                    ctx = contextvars.copy_context()
+                    _refresher.submit(ctx.run, _refresh_in_background,
+                                      key, flight, func, args, kwargs, ttl, max_stale, daily)
+                return value
+
+            if leader:
+                return _fill(key, flight, func, args, kwargs, ttl, max_stale, daily)
+
+            # 같은 키를 계산 중인 호출이 있으면 그 결과를 기다린다
+            _cache.count(name, "coalesced")
+            if not flight.event.wait(CACHE_FLIGHT_TIMEOUT):
+                return func(*args, **kwargs)
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        def invalidate(*args, **kwargs):
+            if args or kwargs:
+                _cache.invalidate(key=_make_key(name, signature, args, kwargs))
+            else:
+                _cache.invalidate(name)
+
+        wrapper.invalidate = invalidate
+        wrapper.cache_name = name
+        wrapper.ttl = ttl
+        wrapper.max_stale = max_stale
+        wrapper.daily = daily
+        return wrapper
+
+    return decorator
+
+
+def invalidate(name=None):
+    """캐시 무효화. name 은 "services.user_service.get_total_users" 같은 함수 이름."""
+    _cache.invalidate(name)
+
+
+def cache_stats():
+    """캐시 항목 수 / 바이트 수 / 함수별 hit · miss 통계를 반환한다."""
+    return _cache.stats()
@@ -0,0 +1,69 @@
+"""
+/utils/columnar.py
+
+?format=columnar 응답 형식.
+[{컬럼: 값, ...}, ...] 대신 컬럼명은 한 번만 보내고 행은 배열로 보낸다.
+같은 문자열이 반복되는 컬럼(상태값, 결제수단 등)은 사전(dicts)으로 빼고
+행에는 사전 인덱스만 넣는다.
+
+{
+    "columns": ["id", "status"],
+    "rows": [[1, 0], [2, 1], [3, 0]],
+    "dicts": {"status": ["DONE", "CANCEL"]}
+}
+
+브라우저에서는 static/columnar.js 의 fromColumnar() 로 원래 형태로 되돌린다.
+"""
+
+from flask import request
+
+# 서로 다른 값의 수가 행 수의 이 비율 이하일 때만 사전으로 바꾼다
+DICT_MAX_RATIO = 0.5
+
+
+def wants_columnar(data=None):
+    """?format=columnar (POST 는 body 의 "format" 도 허용) 요청인지 확인한다."""
+    fmt = request.args.get("format")
+    if fmt is None and data:
+        fmt = data.get("format")
+    return fmt == "columnar"
+
+
+def _dict_encode(values):
+    """문자열 컬럼이면 (사전, 인덱스 리스트), 아니면 None."""
+    index = {}
+    codes = []
+    for v in values:
+        if v is None:
+            codes.append(None)
+        elif type(v) is str:
+            code = index.get(v)
+            if code is None:
+                code = index[v] = len(index)
+            codes.append(code)
+        else:
+            return None
+
+    if not index or len(index) > len(values) * DICT_MAX_RATIO:
+        return None
+    return list(index), codes
+
+
+def to_columnar(rows):
+    """rows(딕셔너리 리스트)를 columnar 형식으로 바꾼다."""
+    if not rows:
+        return {"columns": [], "rows": [], "dicts": {}}
+
+    columns = list(rows[0])
+    table = [list(r.values()) for r in rows]
+    dicts = {}
+
+    for i, col in enumerate(columns):
+        encoded = _dict_encode([row[i] for row in table])
+        if encoded is None:
+            continue
+        dicts[col], codes = encoded
+        for row, code in zip(table, codes):
+            row[i] = code
+
+    return {"columns": columns, "rows": table, "dicts": dicts}
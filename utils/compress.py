@@ -0,0 +1,226 @@
+"""
+/utils/compress.py
+
+응답 압축 (gzip / brotli).
+
+- Accept-Encoding 협상: br(brotli 설치 시) → gzip 순으로 고른다.
+- COMPRESS_MIN_SIZE 보다 작은 응답은 그대로 보낸다.
+- 스트리밍 응답(?stream=1 등)은 청크마다 압축 후 flush 해서 조금씩 내려보낸다.
+- xlsx · 이미지 · zip 처럼 이미 압축된 형식은 건너뛴다. (COMPRESS_SKIP_TYPES)
+- 압축률 / CPU 시간은 /metrics 로 내보낸다.
+- 압축한 응답의 ETag 에는 "-gzip" / "-br" 을 붙인다. 요청의 If-None-Match 에서는 이 접미사를 먼저 떼어 내서
+  send_file / static 의 304 판단(make_conditional)이 원래 ETag 와 비교되게 한다.
+
+    init_compression(app)
+"""
+
+import os
+import time
+import zlib
+
+from flask import g, request
+
+from utils.metrics import Counter, Histogram
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli 미설치 환경
+    brotli = None
+
+
+COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "1") == "1"
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+# 이미 압축된 형식 (mimetype 또는 "image/" 처럼 접두사)
+COMPRESS_SKIP_TYPES = tuple(
+    t.strip() for t in os.getenv(
+        "COMPRESS_SKIP_TYPES",
+        "application/vnd.openxmlformats-officedocument.,"
+        "application/zip,application/gzip,application/x-gzip,application/pdf,"
+        "application/octet-stream,image/,video/,audio/,font/woff"
+    ).split(",") if t.strip()
+)
+
+
+# ===============================
+# 메트릭
+# ===============================
+RATIO_BUCKETS = (1, 1.5, 2, 3, 5, 8, 12, 20, 50)
+
+COMPRESS_BYTES_IN = Counter(
+    "app_compress_input_bytes_total", "압축 전 응답 크기 합계", ["encoding"]
+)
+
+COMPRESS_BYTES_OUT = Counter(
+    "app_compress_output_bytes_total", "압축 후 응답 크기 합계", ["encoding"]
+)
+
+COMPRESS_RATIO = Histogram(
+    "app_compress_ratio", "응답별 압축률 (원본 / 압축)", ["encoding"], buckets=RATIO_BUCKETS
+)
+
+COMPRESS_CPU_SECONDS = Counter(
+    "app_compress_cpu_seconds_total", "압축에 쓴 CPU 시간", ["encoding"]
+)
+
+COMPRESS_SKIPPED = Counter(
+    "app_compress_skipped_total", "압축하지 않은 응답 수", ["reason"]
+)
+
+
+# ===============================
+# 압축기
+# ===============================
+def _compressor(encoding):
+    """(compress(chunk), flush(final)) 쌍을 만든다."""
+    if encoding == "br":
+        c = brotli.Compressor(quality=COMPRESS_BROTLI_QUALITY)
+        return c.process, lambda final: c.finish() if final else c.flush()
+
+    c = zlib.compressobj(COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 → gzip 헤더
+    return c.compress, lambda final: c.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _record(encoding, size_in, size_out, cpu):
+    COMPRESS_BYTES_IN.inc(size_in, encoding=encoding)
+    COMPRESS_BYTES_OUT.inc(size_out, encoding=encoding)
+    COMPRESS_CPU_SECONDS.inc(cpu, encoding=encoding)
+    if size_out:
+        COMPRESS_RATIO.observe(size_in / size_out, encoding=encoding)
+
+
+def compress_bytes(data, encoding):
+    """data 를 한 번에 압축한다."""
+    start = time.thread_time()
+    compress, flush = _compressor(encoding)
+    out = compress(data) + flush(True)
+    _record(encoding, len(data), len(out), time.thread_time() - start)
+    return out
+
+
+def compress_stream(chunks, encoding):
+    """청크 이터러블을 압축하면서 내려보낸다. 청크마다 flush 해서 브라우저가 바로 받게 한다."""
+    compress, flush = _compressor(encoding)
+    size_in = size_out = 0
+    cpu = 0.0
+
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if not chunk:
+                continue
+            start = time.thread_time()
+            out = compress(chunk) + flush(False)
+            cpu += time.thread_time() - start
+            size_in += len(chunk)
+            size_out += len(out)
+            yield out
+
+        start = time.thread_time()
+        out = flush(True)
+        cpu += time.thread_time() - start
+        size_out += len(out)
+        yield out
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+        _record(encoding, size_in, size_out, cpu)
+
+
+# ===============================
+# 협상 / 건너뛰기 판단
+# ===============================
+def _choose_encoding():
+    offers = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offers)
+
+
+def _strip_etag_suffix():
+    """If-None-Match 의 "<etag>-gzip" → "<etag>" (뷰가 304 를 판단하기 전에)"""
+    header = request.environ.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return
+
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        for encoding in ("gzip", "br"):
+            suffix = f'-{encoding}"'
+            if tag.endswith(suffix):
+                tag = tag[:-len(suffix)] + '"'
+                g.etag_encoding = encoding
+                break
+        tags.append(tag)
+    request.environ["HTTP_IF_NONE_MATCH"] = ", ".join(tags)
+
+
+def _skip_reason(response):
+    if request.method == "HEAD":
+        return "head"
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return "status"
+    if "Content-Encoding" in response.headers:
+        return "encoded"
+    if (response.mimetype or "").startswith(COMPRESS_SKIP_TYPES):
+        return "type"
+    return None
+
+
+def _compress_response(response):
+    # 304 는 압축하지 않지만, 클라이언트가 가진 압축 표현의 ETag 로 돌려준다
+    if response.status_code == 304 and g.get("etag_encoding"):
+        etag, weak = response.get_etag()
+        if etag and not etag.endswith(f"-{g.etag_encoding}"):
+            response.set_etag(f"{etag}-{g.etag_encoding}", weak=weak)
+
+    reason = _skip_reason(response)
+    if reason:
+        if reason == "type":
+            COMPRESS_SKIPPED.inc(reason=reason)
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    encoding = _choose_encoding()
+    if not encoding:
+        COMPRESS_SKIPPED.inc(reason="not_accepted")
+        return response
+
+    streamed = response.is_streamed or response.direct_passthrough
+    length = response.content_length
+    if length is not None and length < COMPRESS_MIN_SIZE:
+        COMPRESS_SKIPPED.inc(reason="small")
+        return response
+
+    if streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.direct_passthrough = False
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            COMPRESS_SKIPPED.inc(reason="small")
+            return response
+        response.set_data(compress_bytes(data, encoding))
+
+    response.headers["Content-Encoding"] = encoding
+    response.headers.pop("Accept-Ranges", None)
+
+    # 같은 URL 이라도 인코딩별로 다른 표현이므로 ETag 를 구분한다
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+
+    return response
+
+
+def init_compression(app):
+    """app 의 모든 응답에 압축을 적용한다. (COMPRESS_ENABLED=0 이면 끈다)"""
+    if COMPRESS_ENABLED:
+        app.before_request(_strip_etag_suffix)
+        app.after_request(_compress_response)
+    return app
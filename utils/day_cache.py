@@ -0,0 +1,102 @@
+"""
+/utils/day_cache.py
+
+일자별 집계값 영구 캐시. (로컬 SQLite, 재시작 후에도 유지)
+
+지난 날짜의 합계는 거의 바뀌지 않으므로 한 번 계산한 값을 저장해 두고,
+오늘 + 최근 DAY_CACHE_CORRECTION_DAYS 일(늦게 들어오는 정정 대비)만 DB 에서 다시 읽는다.
+
+    values = get_days("trade_daily_sales", "prod", days, fetch_daily_sales, empty=int)
+    # fetch(env, start, end) → {date: 값}   (start 이상 end 미만, 한 번의 쿼리)
+    # 반환: [(date, 값), ...]  (days 순서)
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+
+from utils.local_store import LocalStore
+from utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+DAY_CACHE_ENABLED = os.getenv("DAY_CACHE_ENABLED", "1") == "1"
+DAY_CACHE_PATH = os.getenv("DAY_CACHE_PATH", "data/day_cache.sqlite3")
+# 오늘 포함 최근 며칠을 항상 다시 읽을지 (0 이면 오늘만)
+DAY_CACHE_CORRECTION_DAYS = int(os.getenv("DAY_CACHE_CORRECTION_DAYS", "2"))
+
+DAY_CACHE_DAYS = Counter(
+    "app_day_cache_days_total", "일자별 캐시에서 읽은 날짜 수 (source=cache/db)", ["series", "source"]
+)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS day_value (
+        series    TEXT NOT NULL,
+        env       TEXT NOT NULL,
+        day       TEXT NOT NULL,
+        value     BLOB NOT NULL,
+        stored_at REAL NOT NULL,
+        PRIMARY KEY (series, env, day)
+    );
+"""
+
+_db = LocalStore(DAY_CACHE_PATH, _SCHEMA)
+
+def _load(series, env, first, last):
+    with closing(_db.connect()) as conn:
+        rows = conn.execute(
+            "SELECT day, value FROM day_value WHERE series=? AND env=? AND day >= ? AND day <= ?",
+            (series, env, first.isoformat(), last.isoformat()),
+        ).fetchall()
+    return {datetime.strptime(day, "%Y-%m-%d").date(): pickle.loads(value) for day, value in rows}
+
+
+def _store(series, env, values):
+    now = time.time()
+    with closing(_db.connect()) as conn, conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO day_value (series, env, day, value, stored_at) VALUES (?, ?, ?, ?, ?)",
+            [(series, env, day.isoformat(), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now)
+             for day, value in values.items()],
+        )
+
+
+def get_days(series, env, days, fetch, empty=int, correction_days=None):
+    """
+    days(date 리스트) 의 값을 반환한다.
+    저장된 지난 날짜는 캐시에서, 나머지(오늘 · 정정 구간 · 처음 보는 날짜)는 fetch 1번으로 읽는다.
+    결과가 없는 날짜는 empty() 값으로 채운다.
+    """
+    correction_days = DAY_CACHE_CORRECTION_DAYS if correction_days is None else correction_days
+    today = datetime.now().date()
+    verify_from = today - timedelta(days=correction_days)
+
+    cached = {}
+    if DAY_CACHE_ENABLED:
+        try:
+            cached = _load(series, env, min(days), max(days))
+        except sqlite3.Error:
+            logger.exception("일자별 캐시 조회 실패 (%s)", series)
+
+    need = [day for day in days if day >= verify_from or day not in cached]
+
+    if need:
+        fetched = fetch(env, min(need), max(need) + timedelta(days=1))
+        fresh = {day: fetched.get(day, empty()) for day in need}
+        cached.update(fresh)
+
+        closed = {day: value for day, value in fresh.items() if day < today}
+        if DAY_CACHE_ENABLED and closed:
+            try:
+                _store(series, env, closed)
+            except sqlite3.Error:
+                logger.exception("일자별 캐시 저장 실패 (%s)", series)
+
+    DAY_CACHE_DAYS.inc(len(days) - len(need), series=series, source="cache")
+    DAY_CACHE_DAYS.inc(len(need), series=series, source="db")
+
+    return [(day, cached[day]) for day in days]
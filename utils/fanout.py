@@ -0,0 +1,63 @@
+"""
+/utils/fanout.py
+
+서로 독립적인 서비스 호출을 공용 스레드 풀에서 동시에 실행하는 유틸리티.
+페이지 응답 시간이 "쿼리 시간의 합"이 아니라 "가장 느린 쿼리 시간"에 가까워진다.
+
+    results = fan_out({
+        "sales": (get_dashboard_sales, "prod"),
+        "total_users": (get_total_users, "prod"),
+    }, timeout=5)
+"""
+
+import contextvars
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", "8"))
+FANOUT_TIMEOUT = float(os.getenv("FANOUT_TIMEOUT", "10"))
+
+_executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="fanout")
+
+
+def fan_out(calls, timeout=None, defaults=None):
+    """
+    calls = {"이름": (함수, 인자1, 인자2, ...)} 를 동시에 실행하고
+    {"이름": 결과} 를 반환한다.
+
+    - timeout 은 fan_out 전체의 마감 시간(초)이다. 호출마다 따로 재는 시간이 아니다.
+      공용 풀(FANOUT_MAX_WORKERS)이 다른 요청으로 차 있으면 대기열에서 기다린 시간도 여기에 포함된다.
+    - 마감까지 끝나지 않은 호출은 defaults["이름"] (없으면 None) 으로 채운다.
+      아직 시작 전이면 취소되지만, 이미 실행 중인 호출은 멈추지 않는다.
+      (쿼리가 끝날 때까지 워커와 DB 커넥션을 계속 쓴다 → 쿼리 자체의 제한 시간은 DB 쪽에서 걸어야 한다)
+    - 예외가 난 호출도 defaults 값으로 채운다.
+    - 호출하는 쪽의 contextvars(Flask request context 등)를 그대로 넘겨준다.
+    """
+    timeout = FANOUT_TIMEOUT if timeout is None else timeout
+    defaults = defaults or {}
+
+    futures = {}
+    for name, (func, *args) in calls.items():
+        ctx = contextvars.copy_context()
+        futures[name] = _executor.submit(ctx.run, func, *args)
+
+    done, _ = wait(futures.values(), timeout=timeout)
+
+    results = {}
+    for name, future in futures.items():
+        if future not in done:
+            if future.cancel():
+                logger.warning("fan_out: %s not started before the %ss deadline (pool busy)", name, timeout)
+            else:
+                logger.warning("fan_out: %s still running after the %ss deadline", name, timeout)
+            results[name] = defaults.get(name)
+        elif future.exception() is not None:
+            logger.warning("fan_out: %s failed: %r", name, future.exception())
+            results[name] = defaults.get(name)
+        else:
+            results[name] = future.result()
+
+    return results
@@ -0,0 +1,85 @@
+"""
+/utils/http_cache.py
+
+JSON 응답 조건부 요청 (ETag / 304 / Cache-Control).
+
+- ETag    : 데이터 버전(예: 스냅샷 computed_at)으로 만든 strong ETag.
+            버전이 없으면 응답 본문 해시를 쓴다.
+- 304     : If-None-Match 가 같으면 본문 없이 304.
+            버전을 아는 경우 not_modified() 로 데이터를 읽기 전에 판단할 수 있다.
+- 압축    : utils/compress.py 가 ETag 뒤에 "-gzip" / "-br" 을 붙이므로 비교할 때 떼어 낸다.
+- 캐시    : Cache-Control: private, max-age=HTTP_CACHE_MAX_AGE
+
+    response = not_modified(version)          # 버전을 먼저 알 때
+    if response is not None:
+        return response
+    return conditional_json(data, version)
+"""
+
+import hashlib
+import os
+
+from flask import current_app, request
+
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "30"))
+
+# utils/compress.py 가 붙이는 인코딩 접미사
+_ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def make_etag(value):
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return hashlib.sha1(value).hexdigest()
+
+
+def _matching_tag(etag):
+    """If-None-Match 중 etag 와 같은 것(클라이언트가 보낸 그대로) 또는 None"""
+    tags = request.if_none_match
+    if tags.star_tag:
+        return etag
+    for tag in tags.as_set(include_weak=True):
+        base = tag
+        for suffix in _ENCODING_SUFFIXES:
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+                break
+        if base == etag:
+            return tag
+    return None
+
+
+def _cache_headers(response, max_age):
+    response.cache_control.private = True
+    response.cache_control.max_age = HTTP_CACHE_MAX_AGE if max_age is None else max_age
+    return response
+
+
+def _not_modified(etag, max_age):
+    tag = _matching_tag(etag)
+    if tag is None:
+        return None
+
+    response = current_app.response_class(status=304)
+    # 클라이언트가 가진 표현(압축 인코딩 포함)의 ETag 를 그대로 돌려준다
+    response.set_etag(tag)
+    return _cache_headers(response, max_age)
+
+
+def not_modified(version, max_age=None):
+    """version 의 ETag 가 If-None-Match 와 같으면 304 응답, 아니면 None."""
+    return _not_modified(make_etag(version), max_age)
+
+
+def conditional_json(data, version=None, max_age=None):
+    """ETag / Cache-Control 을 붙인 JSON 응답. If-None-Match 가 같으면 304."""
+    body = current_app.json.dumps(data)
+    etag = make_etag(body if version is None else version)
+
+    response = _not_modified(etag, max_age)
+    if response is not None:
+        return response
+
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    return _cache_headers(response, max_age)
@@ -0,0 +1,102 @@
+"""
+/utils/json_provider.py
+
+Flask JSON 프로바이더 (jsonify / app.json.dumps 에 공통 적용).
+
+orjson 이 설치되어 있으면 orjson 으로, 없으면 표준 json 으로 직렬화한다.
+어느 쪽이든 DB 에서 나오는 타입은 같은 모양으로 내려간다.
+
+- datetime  → "2024-01-31T09:30:00"  (ISO 8601)
+- date      → "2024-01-31"
+- time      → "09:30:00"
+- timedelta → "9:30:00"              (MySQL TIME 컬럼)
+- Decimal   → 항상 문자열 "12345.00" (정밀도 보존, Flask 기본과 같음)  ← SUM(amount) 등
+- UUID      → "xxxxxxxx-xxxx-..."
+- bytes     → UTF-8 문자열 (깨지면 base64)
+- set       → 배열
+
+컬럼 순서는 SELECT 순서 그대로 둔다. (sort_keys = False)
+"""
+
+import datetime
+import decimal
+import uuid
+
+from flask.json.provider import DefaultJSONProvider
+
+from config.row_decode import decode_bytes
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 미설치 환경
+    orjson = None
+
+
+def _orjson_default(o):
+    """orjson 이 직접 처리하지 못하는 타입만 여기로 온다."""
+    if isinstance(o, decimal.Decimal):
+        # float 로 바꾸면 정밀도가 깨지므로 값과 상관없이 문자열로 보낸다
+        return str(o)
+    if isinstance(o, datetime.timedelta):
+        return str(o)
+    if isinstance(o, (bytes, bytearray, memoryview)):
+        return decode_bytes(bytes(o))
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _std_default(o):
+    """표준 json 용. orjson 과 같은 문자열 형식을 만든다."""
+    if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    return _orjson_default(o)
+
+
+class StdJSONProvider(DefaultJSONProvider):
+    """표준 json 기반. 타입 변환 규칙만 orjson 쪽과 맞춘다."""
+
+    default = staticmethod(_std_default)
+    sort_keys = False
+
+
+class OrjsonProvider(StdJSONProvider):
+    """orjson 기반 프로바이더. dumps 에 json.dumps 전용 인자가 오면 표준 json 으로 처리한다."""
+
+    def _options(self, pretty=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_orjson_default, option=self._options()).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=_orjson_default, option=self._options(pretty))
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+FastJSONProvider = OrjsonProvider if orjson is not None else StdJSONProvider
+
+
+def init_json(app, provider_class=None):
+    """app 의 JSON 프로바이더를 교체한다. (기본: orjson 이 있으면 OrjsonProvider)"""
+    app.json_provider_class = provider_class or FastJSONProvider
+    app.json = app.json_provider_class(app)
+    return app.json
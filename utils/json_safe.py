@@ -1,13 +0,0 @@
-import base64
-
-def json_safe(row):
-    safe = {}
-    for k, v in row.items():
-        if isinstance(v, bytes):
-            try:
-                safe[k] = v.decode("utf-8")
-            except:
-                safe[k] = base64.b64encode(v).decode("utf-8")
-        else:
-            safe[k] = v
-    return safe
@@ -0,0 +1,36 @@
+from flask import Response, current_app, stream_with_context
+
+_END = object()
+
+
+def stream_json_array(rows, batch_size=500):
+    """
+    rows(이터러블)를 JSON 배열로 조금씩 내려보내는 Response 를 만든다.
+    jsonify(list(rows)) 와 같은 형태지만 전체 결과를 메모리에 올리지 않는다.
+
+    첫 행은 Response 를 만들기 전에(뷰 안에서) 읽는다.
+    → 커서 열기 · admission 거절(429/503) · SQL 오류가 200 이전에 일반 오류 응답으로 나간다.
+    """
+    rows = iter(rows)
+    head = next(rows, _END)
+
+    def generate():
+        dumps = current_app.json.dumps
+        yield "["
+        if head is _END:
+            yield "]"
+            return
+
+        buf = [dumps(head)]
+        first = True
+        for row in rows:
+            buf.append(dumps(row))
+            if len(buf) >= batch_size:
+                yield ("" if first else ",") + ",".join(buf)
+                first = False
+                buf = []
+        if buf:
+            yield ("" if first else ",") + ",".join(buf)
+        yield "]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
@@ -0,0 +1,87 @@
+"""
+/utils/local_store.py
+
+워커끼리 공유하는 로컬 SQLite 저장소. (KPI 스냅샷 · 가입자 카운터 · rollup · 일자별 캐시 공용)
+
+- 연결    : WAL 모드, 처음 연결할 때 스키마를 한 번만 만든다, row 는 sqlite3.Row
+- lease   : 모든 저장소에 lease 테이블이 있다
+            acquire_lease(name, ttl) → 같은 서버의 여러 gunicorn 워커 중 하나만 작업하게 한다
+
+    _db = LocalStore(os.getenv("XXX_PATH", "data/xxx.sqlite3"), _SCHEMA)
+
+    with closing(_db.connect()) as conn, conn:      # 블록이 끝나면 commit
+        conn.execute(...)
+
+    if _db.acquire_lease("job:prod", 180):         # 다른 워커가 잡고 있으면 False
+        ...
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+_LEASE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS lease (
+        name       TEXT PRIMARY KEY,
+        owner      TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+"""
+
+
+def worker_id():
+    """이 워커를 구분하는 이름 (lease 소유자). fork 뒤에도 맞도록 매번 pid 를 읽는다."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LocalStore:
+    """path 의 SQLite 파일. schema 는 CREATE TABLE IF NOT EXISTS 문들."""
+
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema + _LEASE_SCHEMA
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(self.schema)
+                    self._schema_ready = True
+        return conn
+
+    def acquire_lease(self, name, ttl):
+        """
+        name 의 lease 를 ttl 초 동안 잡는다. 다른 워커가 유효한 lease 를 갖고 있으면 False.
+        이미 내 lease 면 연장한다.
+        """
+        now = time.time()
+        owner = worker_id()
+        with closing(self.connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT owner, expires_at FROM lease WHERE name=?", (name,)).fetchone()
+                if row is not None and row["owner"] != owner and row["expires_at"] > now:
+                    conn.rollback()
+                    return False
+                conn.execute(
+                    "INSERT OR REPLACE INTO lease (name, owner, expires_at) VALUES (?, ?, ?)",
+                    (name, owner, now + ttl),
+                )
+                conn.commit()
+                return True
+            except BaseException:
+                conn.rollback()
+                raise